@@ -0,0 +1,423 @@
+"""A/B harness: grade the same stored responses with two grader configurations
+
+Usage:
+    python benchmarks/ab_grading.py --b model=llama-3.1-8b-instant
+    python benchmarks/ab_grading.py --a compact=false --b compact=true --limit 40
+    python benchmarks/ab_grading.py --stand-in --b model=small --json ab.json
+
+The corpus is each team's latest response per case from the local submission
+store (run `python -m residentcase backfill` first), with the stored
+production grade as a reference. --faculty adds faculty scores from a CSV
+with case,team,score columns.
+
+A configuration is a comma-separated list of overrides of the production
+grader: model, temperature, max_tokens, compact (prompt compaction),
+base_url (any OpenAI-compatible endpoint) and api_key_env (the environment
+variable holding its key). Both configurations grade the corpus at the same
+time, each with --workers requests in flight, and the report compares
+their scores (with each other, the stored grades and faculty scores),
+latency percentiles, token usage and parse-failure rates.
+
+--stand-in serves a local OpenAI-compatible endpoint instead of Groq, with
+deterministic scores, simulated latency and an adjustable share of
+malformed replies, so the harness itself can be checked offline.
+"""
+
+import argparse
+import csv
+import hashlib
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from residentcase.cassette import http_request  # noqa: E402
+from residentcase.catalog import load_cases  # noqa: E402
+from residentcase.compaction import estimate_tokens  # noqa: E402
+from residentcase.grading import (  # noqa: E402
+    GRADING_MAX_TOKENS,
+    GRADING_TEMPERATURE,
+    GROQ_API_BASE,
+    GROQ_MODEL,
+    REQUEST_TIMEOUT,
+    SCORE_RE,
+    build_prompt,
+    completion_payload,
+    get_evaluation_store,
+    parse_evaluation,
+    prompt_compaction,
+)
+from residentcase.ingest import (  # noqa: E402
+    categorize_responses_by_case,
+    deduplicate_responses,
+    get_submission_sync,
+)
+from residentcase.scoring import score_agreement  # noqa: E402
+from residentcase.store import response_hash  # noqa: E402
+
+RETRIES = 3
+# Scores this close count as agreeing
+AGREEMENT_MARGIN = 10
+
+
+def production_config() -> Dict:
+    return {
+        "base_url": GROQ_API_BASE,
+        "api_key_env": "GROQ_API_KEY",
+        "model": GROQ_MODEL,
+        "temperature": GRADING_TEMPERATURE,
+        "max_tokens": GRADING_MAX_TOKENS,
+        "compact": prompt_compaction(),
+    }
+
+
+def parse_config(overrides: str, base: Dict) -> Dict:
+    """Apply "key=value,key=value" overrides to a configuration"""
+    config = dict(base)
+    for item in filter(None, (part.strip() for part in overrides.split(","))):
+        key, _, value = item.partition("=")
+        if key not in config:
+            raise SystemExit(f"Unknown grader setting {key!r} (use {sorted(config)})")
+        if key in ("temperature",):
+            config[key] = float(value)
+        elif key in ("max_tokens",):
+            config[key] = int(value)
+        elif key == "compact":
+            config[key] = value.lower() in ("1", "true", "yes")
+        else:
+            config[key] = value
+    return config
+
+
+def describe(config: Dict, base: Dict) -> str:
+    changed = [f"{k}={v}" for k, v in config.items() if v != base.get(k)]
+    return ", ".join(changed) or "production"
+
+
+def load_corpus(
+    form_id: Optional[str], limit: Optional[int], faculty: Dict
+) -> List[Dict]:
+    """Latest response per team and case, with stored and faculty scores"""
+    cases = load_cases()
+    submissions = get_submission_sync(form_id).store.all()
+    store = get_evaluation_store(form_id)
+    corpus = []
+    for case_idx, case in enumerate(cases):
+        case_number = case_idx + 1
+        for response_data in deduplicate_responses(
+            categorize_responses_by_case(submissions, case_number)
+        ):
+            stored = store.get(case_number, response_hash(response_data["response"]))
+            corpus.append(
+                {
+                    "case_number": case_number,
+                    "case": case,
+                    "team": response_data["team"],
+                    "response": response_data["response"],
+                    "stored": (
+                        stored["score"]
+                        if stored and not stored.get("provisional")
+                        else None
+                    ),
+                    "faculty": faculty.get((case_number, response_data["team"])),
+                }
+            )
+    return corpus[:limit] if limit else corpus
+
+
+def load_faculty(path: Optional[str]) -> Dict:
+    if not path:
+        return {}
+    with open(path, newline="", encoding="utf-8") as f:
+        return {
+            (int(row["case"]), row["team"].strip()): float(row["score"])
+            for row in csv.DictReader(f)
+        }
+
+
+def grade(config: Dict, item: Dict) -> Dict:
+    """One grading call, timed, with its token usage and parse outcome"""
+    system, prompt = build_prompt(
+        item["case"]["description"],
+        item["case"]["management"],
+        item["response"],
+        config["compact"],
+    )
+    payload = completion_payload(
+        system, prompt, config["model"], config["temperature"], config["max_tokens"]
+    )
+    headers = {
+        "Authorization": f"Bearer {os.getenv(config['api_key_env'], '')}",
+        "Content-Type": "application/json",
+    }
+    result = {"score": None, "parsed": False, "error": None, "retries": 0}
+    started = time.perf_counter()
+    try:
+        for attempt in range(RETRIES):
+            response = http_request(
+                "POST",
+                f"{config['base_url'].rstrip('/')}/chat/completions",
+                json=payload,
+                headers=headers,
+                timeout=REQUEST_TIMEOUT,
+            )
+            if response.status_code == 429 and attempt < RETRIES - 1:
+                result["retries"] += 1
+                time.sleep(2**attempt)
+                continue
+            response.raise_for_status()
+            break
+        body = response.json()
+        text = body["choices"][0]["message"]["content"]
+        usage = body.get("usage") or {}
+        result.update(
+            parsed=SCORE_RE.search(text) is not None,
+            score=parse_evaluation(text)["score"],
+            prompt_tokens=usage.get("prompt_tokens", 0),
+            completion_tokens=usage.get("completion_tokens", 0),
+        )
+    except Exception as e:
+        result["error"] = str(e)
+    result["latency"] = time.perf_counter() - started
+    return result
+
+
+def run_both(configs: Dict[str, Dict], corpus: List[Dict], workers: int) -> Dict:
+    """Grade the corpus with every configuration at once"""
+    pools = {name: ThreadPoolExecutor(max_workers=workers) for name in configs}
+    futures = {
+        name: [pools[name].submit(grade, config, item) for item in corpus]
+        for name, config in configs.items()
+    }
+    results = {name: [f.result() for f in items] for name, items in futures.items()}
+    for pool in pools.values():
+        pool.shutdown()
+    return results
+
+
+def summarize(results: List[Dict]) -> Dict:
+    ok = [r for r in results if r["error"] is None]
+    latencies = [r["latency"] * 1000 for r in ok]
+    p50, p90, p99 = np.percentile(latencies, [50, 90, 99]) if latencies else (0, 0, 0)
+    return {
+        "calls": len(results),
+        "errors": len(results) - len(ok),
+        "retries": sum(r["retries"] for r in results),
+        "parse_failures": sum(not r["parsed"] for r in ok),
+        "parse_failure_rate": (
+            sum(not r["parsed"] for r in ok) / len(ok) if ok else 0.0
+        ),
+        "latency_ms": {"p50": p50, "p90": p90, "p99": p99},
+        "prompt_tokens": sum(r.get("prompt_tokens", 0) for r in ok),
+        "completion_tokens": sum(r.get("completion_tokens", 0) for r in ok),
+    }
+
+
+def agreement(first: List[Optional[float]], second: List[Optional[float]]) -> Dict:
+    """score_agreement over the items both sides scored, plus the share within
+    AGREEMENT_MARGIN points"""
+    pairs = [(a, b) for a, b in zip(first, second) if a is not None and b is not None]
+    report = score_agreement([a for a, _ in pairs], [b for _, b in pairs])
+    report["within"] = (
+        sum(abs(a - b) <= AGREEMENT_MARGIN for a, b in pairs) / len(pairs)
+        if pairs
+        else None
+    )
+    return report
+
+
+def build_report(configs: Dict, corpus: List[Dict], results: Dict) -> Dict:
+    scores = {
+        name: [r["score"] if r["parsed"] else None for r in items]
+        for name, items in results.items()
+    }
+    comparisons = {"A vs B": agreement(scores["A"], scores["B"])}
+    for reference in ("stored", "faculty"):
+        values = [item[reference] for item in corpus]
+        if any(v is not None for v in values):
+            for name in configs:
+                comparisons[f"{name} vs {reference}"] = agreement(scores[name], values)
+    return {
+        "corpus": len(corpus),
+        "configs": configs,
+        "summary": {name: summarize(items) for name, items in results.items()},
+        "agreement": comparisons,
+    }
+
+
+def print_report(report: Dict, base: Dict):
+    print(f"{report['corpus']} response(s) graded by each configuration")
+    for name, config in report["configs"].items():
+        print(f"  {name}: {describe(config, base)}")
+    print()
+
+    rows = [
+        ("errors", lambda s: f"{s['errors']}"),
+        ("retries (429)", lambda s: f"{s['retries']}"),
+        (
+            "parse failures",
+            lambda s: f"{s['parse_failures']} ({s['parse_failure_rate']:.1%})",
+        ),
+        ("latency p50 ms", lambda s: f"{s['latency_ms']['p50']:.0f}"),
+        ("latency p90 ms", lambda s: f"{s['latency_ms']['p90']:.0f}"),
+        ("latency p99 ms", lambda s: f"{s['latency_ms']['p99']:.0f}"),
+        ("prompt tokens", lambda s: f"{s['prompt_tokens']:,}"),
+        ("completion tokens", lambda s: f"{s['completion_tokens']:,}"),
+    ]
+    summary = report["summary"]
+    print(f"{'':<20}{'A':>16}{'B':>16}")
+    for label, cell in rows:
+        print(f"{label:<20}{cell(summary['A']):>16}{cell(summary['B']):>16}")
+    print()
+
+    print(
+        f"{'agreement':<20}{'n':>6}{'MAE':>8}{'r':>8}{'±' + str(AGREEMENT_MARGIN):>8}"
+    )
+    for label, result in report["agreement"].items():
+        if not result["n"]:
+            print(f"{label:<20}{0:>6}")
+            continue
+        r = (
+            f"{result['correlation']:.2f}"
+            if result["correlation"] is not None
+            else "n/a"
+        )
+        print(
+            f"{label:<20}{result['n']:>6}{result['mae']:>8.1f}{r:>8}"
+            f"{result['within']:>8.0%}"
+        )
+
+
+# The team's response sits between this heading and the grading protocol,
+# with or without prompt compaction
+_RESPONSE_RE = re.compile(
+    r"Team's Response to Evaluate:\**\s*(.*?)\s*(?:---\s*)?STRICT EVALUATION", re.DOTALL
+)
+
+
+class _StandInHandler(BaseHTTPRequestHandler):
+    """OpenAI-compatible chat completions with deterministic grades"""
+
+    latency = 0.2
+    malformed = 0.0
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        prompt = "".join(m["content"] for m in body["messages"])
+        match = _RESPONSE_RE.search(prompt)
+        graded = re.sub(r"\\?\[\d+\\?\]", "", match.group(1) if match else prompt)
+        graded = re.sub(r"\W+", " ", graded)
+        seed = hashlib.sha256(graded.strip().encode("utf-8")).digest()
+        # The same response scores alike under every model, give or take a few
+        # points, so agreement numbers behave like the real comparison
+        base = 30 + seed[0] % 60
+        rng = random.Random(f"{body['model']}:{seed.hex()}")
+        score = max(0, min(100, base + rng.randint(-8, 8)))
+        time.sleep(self.latency * (0.5 + len(prompt) / 8000) * rng.uniform(0.7, 1.5))
+
+        if rng.random() < self.malformed:
+            content = "The response is reasonable overall."
+        else:
+            content = (
+                "CHECKLIST:\n1. Reference point — HIT\nTALLY: 1 HITs\n"
+                f"SCORE: {score}\nSTRENGTHS:\n- Sound plan\n"
+                "AREAS FOR IMPROVEMENT:\n- Follow-up\nKEY POINTS MISSED:\n- None\n"
+                "CLINICAL REASONING:\nAdequate."
+            )
+        reply = json.dumps(
+            {
+                "choices": [{"message": {"role": "assistant", "content": content}}],
+                "usage": {
+                    "prompt_tokens": estimate_tokens(prompt),
+                    "completion_tokens": estimate_tokens(content),
+                },
+            }
+        ).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(reply)))
+        self.end_headers()
+        self.wfile.write(reply)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_stand_in(latency: float, malformed: float) -> str:
+    """Serve the stand-in grader on a free local port, returning its base URL"""
+    handler = type(
+        "StandInHandler",
+        (_StandInHandler,),
+        {"latency": latency, "malformed": malformed},
+    )
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.server_address[1]}/v1"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--a", default="", help="Overrides for configuration A")
+    parser.add_argument("--b", default="", help="Overrides for configuration B")
+    parser.add_argument("--form", help="Tally form id (default TALLY_FORM_ID)")
+    parser.add_argument("--limit", type=int, help="Grade only the first N responses")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--faculty", help="CSV of faculty scores (case,team,score)")
+    parser.add_argument("--json", help="Also write the report and raw results here")
+    parser.add_argument(
+        "--stand-in", action="store_true", help="Grade against a local stand-in"
+    )
+    parser.add_argument("--stand-in-latency", type=float, default=0.2)
+    parser.add_argument(
+        "--stand-in-malformed",
+        type=float,
+        default=0.02,
+        help="Share of stand-in replies without a SCORE line",
+    )
+    args = parser.parse_args()
+
+    base = production_config()
+    if args.stand_in:
+        base["base_url"] = start_stand_in(
+            args.stand_in_latency, args.stand_in_malformed
+        )
+    configs = {"A": parse_config(args.a, base), "B": parse_config(args.b, base)}
+
+    corpus = load_corpus(args.form, args.limit, load_faculty(args.faculty))
+    if not corpus:
+        raise SystemExit(
+            "No stored responses; run `python -m residentcase backfill` first"
+        )
+
+    started = time.perf_counter()
+    results = run_both(configs, corpus, args.workers)
+    report = build_report(configs, corpus, results)
+    print_report(report, base)
+    print(f"\nFinished in {time.perf_counter() - started:.1f}s")
+
+    if args.json:
+        raw = {
+            name: [
+                {"case_number": item["case_number"], "team": item["team"], **r}
+                for item, r in zip(corpus, items)
+            ]
+            for name, items in results.items()
+        }
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({**report, "results": raw}, f, indent=2, default=float)
+
+
+if __name__ == "__main__":
+    main()
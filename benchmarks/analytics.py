@@ -0,0 +1,62 @@
+"""Time the leaderboard's cohort analytics on synthetic cohorts
+
+Usage:
+    python benchmarks/analytics.py [--teams 1000 5000] [--cases 10] [--runs 5]
+
+Each team attempts a random ~80% of the cases, with harder cases scoring
+lower, which is the shape that makes raw totals misleading.
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from residentcase.analytics import cohort_analytics  # noqa: E402
+
+
+def synthetic_cohort(teams: int, cases: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    difficulty = rng.uniform(0, 30, size=cases)
+    skill = rng.normal(70, 10, size=teams)
+    scores = np.clip(
+        skill[:, None] - difficulty + rng.normal(0, 8, (teams, cases)), 0, 100
+    )
+    attempted = rng.random((teams, cases)) < 0.8
+    return {
+        f"Team {t + 1}": {
+            c + 1: int(scores[t, c]) for c in range(cases) if attempted[t, c]
+        }
+        for t in range(teams)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--teams", type=int, nargs="+", default=[100, 1000, 5000])
+    parser.add_argument("--cases", type=int, default=10)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'teams':>8} {'median ms':>10} {'max ms':>8}")
+    for teams in args.teams:
+        cohort = synthetic_cohort(teams, args.cases)
+        timings = []
+        for _ in range(args.runs):
+            started = time.perf_counter()
+            cohort_analytics(cohort, args.cases)
+            timings.append(time.perf_counter() - started)
+        print(
+            f"{teams:>8} {statistics.median(timings) * 1000:>10.1f} "
+            f"{max(timings) * 1000:>8.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
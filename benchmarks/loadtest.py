@@ -0,0 +1,439 @@
+"""Load test: N concurrent simulated sessions against a local server with stubbed APIs
+
+Usage:
+    python benchmarks/loadtest.py [--sessions 10 50 200] [--actions 15]
+
+For each level a fresh `streamlit run app.py` server is started with empty
+stores, and Tally and Groq replaced by a cassette replaying canned replies
+after --tally-latency / --groq-latency seconds. The simulated sessions talk
+to it over Streamlit's websocket protocol, like browsers do (this needs the
+`websockets` package, which Streamlit's server already depends on).
+
+Sessions load the app, then repeatedly switch cases, view the current page
+again (tab switches happen in the browser, so the server sees the rerun of
+the next interaction), click "Evaluate All", and refresh the leaderboard.
+Reported per level: rerun latency percentiles per action, errors, the
+server's peak RSS, and its CPU use (100% = one core).
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+from typing import Dict, List, Optional, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+APP = os.path.join(ROOT, "app.py")
+
+VIEW_RADIO = "Select View:"
+CASE_RADIO = "Cases"
+CASES_VIEW = "📋 Individual Cases"
+LEADERBOARD_VIEW = "📊 Overall Leaderboard"
+
+ACTIONS = ["switch_case", "view_tab", "evaluate", "leaderboard"]
+WEIGHTS = [4, 3, 2, 2]
+
+SCRIPT_DONE = (0, 1)  # FINISHED_SUCCESSFULLY, FINISHED_WITH_COMPILE_ERROR
+
+GROQ_REPLY = """CHECKLIST:
+1. Lifestyle modification — HIT
+2. Metformin — PARTIAL
+TALLY: 1 HITs, 1 PARTIALs, 0 MISSEDs out of 2 points
+
+SCORE: 62
+
+STRENGTHS:
+- Names first-line therapy
+
+AREAS FOR IMPROVEMENT:
+- Follow-up plan
+
+KEY POINTS MISSED:
+- Monitoring
+
+CLINICAL REASONING:
+Reasonable plan with gaps in follow-up.
+"""
+
+TREATMENTS = [
+    "metformin",
+    "DSMES referral",
+    "medical nutrition therapy",
+    "GLP-1 receptor agonist",
+    "SGLT2 inhibitor",
+    "basal insulin",
+    "statin",
+    "ACE inhibitor",
+    "retinal exam",
+    "foot exam",
+    "A1C in 3 months",
+]
+
+
+def percentile(values, q: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(q / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def synthetic_submissions(teams: int, cases: int, rng: random.Random):
+    submissions = []
+    for team in range(1, teams + 1):
+        for case in range(1, cases + 1):
+            plan = ", ".join(rng.sample(TREATMENTS, rng.randint(2, 6)))
+            submissions.append(
+                {
+                    "submittedAt": f"2026-01-01T10:{team % 60:02d}:00Z",
+                    "responses": [
+                        {"questionId": "oAR5MN", "answer": [str(team)]},
+                        {"questionId": "GrpqdO", "answer": {"case_number": str(case)}},
+                        {"questionId": "OAXb5M", "answer": f"Team {team}"},
+                        {"questionId": "PA9b5x", "answer": f"Start {plan}."},
+                    ],
+                }
+            )
+    return submissions
+
+
+def write_stub_cassette(path: str, submissions, tally_latency, groq_latency):
+    """Canned Tally and Groq replies, matched on URL alone"""
+    from residentcase.cassette import request_key
+    from residentcase.ingest import tally_api_url
+
+    groq_url = "https://api.groq.com/openai/v1/chat/completions"
+    tally = {"submissions": submissions, "hasMore": False}
+    groq = {"choices": [{"message": {"content": GROQ_REPLY}}]}
+    with open(path, "w", encoding="utf-8") as f:
+        for method, url, body, elapsed in [
+            ("GET", tally_api_url(), tally, tally_latency),
+            ("POST", groq_url, groq, groq_latency),
+        ]:
+            interaction = {
+                "key": request_key(method, url),
+                "method": method,
+                "url": url,
+                "status": 200,
+                "headers": {"Content-Type": "application/json"},
+                "body": json.dumps(body),
+                "elapsed": elapsed,
+            }
+            f.write(json.dumps(interaction) + "\n")
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("localhost", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(port: int, tmp: str, args) -> subprocess.Popen:
+    """`streamlit run app.py` with temporary stores and the stub cassette"""
+    from residentcase.catalog import load_cases
+
+    cassette = os.path.join(tmp, "stub.jsonl")
+    write_stub_cassette(
+        cassette,
+        synthetic_submissions(args.teams, len(load_cases()), random.Random(args.seed)),
+        args.tally_latency,
+        args.groq_latency,
+    )
+    env = {
+        **os.environ,
+        "HTTP_CASSETTE": cassette,
+        "HTTP_CASSETTE_MATCH": "url",
+        "USE_TALLY_API": "true",
+        "EVAL_STORE_PATH": os.path.join(tmp, "evaluations.sqlite3"),
+        "SUBMISSION_STORE_PATH": os.path.join(tmp, "submissions.sqlite3"),
+    }
+    server = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "streamlit",
+            "run",
+            APP,
+            "--server.headless=true",
+            f"--server.port={port}",
+            "--server.enableXsrfProtection=false",
+            "--browser.gatherUsageStats=false",
+        ],
+        cwd=ROOT,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=open(os.path.join(tmp, "server.log"), "w"),
+    )
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        try:
+            with urllib.request.urlopen(f"http://localhost:{port}/_stcore/health"):
+                return server
+        except OSError:
+            time.sleep(0.2)
+    server.kill()
+    raise RuntimeError(f"Server did not start; see {tmp}/server.log")
+
+
+class ProcessSampler:
+    """Samples another process's RSS and CPU time from /proc"""
+
+    def __init__(self, pid: int, interval: float = 0.5):
+        self.pid = pid
+        self.interval = interval
+        self.peak_rss = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def rss(self) -> int:
+        with open(f"/proc/{self.pid}/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+    def cpu_seconds(self) -> float:
+        with open(f"/proc/{self.pid}/stat") as f:
+            # utime and stime are the 12th and 13th fields after the
+            # parenthesised command name
+            fields = f.read().rsplit(")", 1)[1].split()
+        return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.peak_rss = max(self.peak_rss, self.rss())
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        self.cpu_started = self.cpu_seconds()
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak_rss = max(self.peak_rss, self.rss())
+        self.wall = time.perf_counter() - self.started
+        self.cpu = self.cpu_seconds() - self.cpu_started
+
+
+class Session:
+    """One simulated browser tab speaking Streamlit's websocket protocol"""
+
+    def __init__(self, ws, timeout: float):
+        self.ws = ws
+        self.timeout = timeout
+        self.radios: Dict[str, Tuple[str, List[str]]] = {}  # label -> (id, options)
+        self.buttons: Dict[str, str] = {}  # label -> id
+        self.values: Dict[str, str] = {}  # radio id -> selected option
+        self.errors: List[str] = []
+
+    async def rerun(self, radio: Optional[Tuple[str, str]] = None, click=None):
+        """Send a rerun with the current widget values and wait for it to finish"""
+        from streamlit.proto.BackMsg_pb2 import BackMsg
+
+        if radio:
+            label, option = radio
+            self.values[self.radios[label][0]] = option
+        msg = BackMsg()
+        msg.rerun_script.query_string = ""
+        msg.rerun_script.page_script_hash = ""
+        for radio_id, _ in self.radios.values():
+            if radio_id in self.values:
+                state = msg.rerun_script.widget_states.widgets.add()
+                state.id = radio_id
+                state.string_value = self.values[radio_id]
+        if click:
+            state = msg.rerun_script.widget_states.widgets.add()
+            state.id = self.buttons[click]
+            state.trigger_value = True
+        await self.ws.send(msg.SerializeToString())
+        await asyncio.wait_for(self._read_run(), self.timeout)
+
+    async def _read_run(self):
+        from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+        radios, buttons = {}, {}
+        while True:
+            message = ForwardMsg()
+            message.ParseFromString(await self.ws.recv())
+            kind = message.WhichOneof("type")
+            if kind == "delta" and message.delta.WhichOneof("type") == "new_element":
+                element = message.delta.new_element
+                element_type = element.WhichOneof("type")
+                if element_type == "radio":
+                    radios[element.radio.label] = (
+                        element.radio.id,
+                        list(element.radio.options),
+                    )
+                elif element_type == "button":
+                    buttons[element.button.label] = element.button.id
+                elif element_type == "exception":
+                    self.errors.append(element.exception.message)
+            elif kind == "script_finished":
+                if message.script_finished in SCRIPT_DONE:
+                    self.radios, self.buttons = radios, buttons
+                    return
+                # Finished early for an st.rerun(); the next run follows
+                radios, buttons = {}, {}
+
+    def button(self, text: str) -> Optional[str]:
+        return next((label for label in self.buttons if text in label), None)
+
+
+async def run_session(seed: int, url: str, args, timings, errors):
+    import websockets
+
+    rng = random.Random(seed)
+    try:
+        ws = await websockets.connect(
+            url, subprotocols=["streamlit"], max_size=None, open_timeout=args.timeout
+        )
+    except Exception as e:
+        errors.append(f"connect: {type(e).__name__}: {e}")
+        return
+    session = Session(ws, args.timeout)
+
+    async def timed(action: str, step):
+        started = time.perf_counter()
+        try:
+            await step()
+        except Exception as e:
+            errors.append(f"{action}: {type(e).__name__}: {e}")
+        timings.append((action, time.perf_counter() - started))
+
+    def show_cases():
+        return session.rerun(radio=(VIEW_RADIO, CASES_VIEW))
+
+    async def switch_case():
+        if CASE_RADIO not in session.radios:
+            await show_cases()
+        else:
+            options = session.radios[CASE_RADIO][1]
+            await session.rerun(radio=(CASE_RADIO, rng.choice(options)))
+
+    async def evaluate():
+        label = session.button("Evaluate All") or session.button("Remaining")
+        await (session.rerun(click=label) if label else show_cases())
+
+    async def leaderboard():
+        await session.rerun(radio=(VIEW_RADIO, LEADERBOARD_VIEW))
+
+    steps = {
+        "switch_case": switch_case,
+        "view_tab": session.rerun,
+        "evaluate": evaluate,
+        "leaderboard": leaderboard,
+    }
+
+    async with ws:
+        await timed("load", session.rerun)
+        for _ in range(args.actions):
+            await asyncio.sleep(rng.uniform(0, 2 * args.think))
+            action = rng.choices(ACTIONS, WEIGHTS)[0]
+            await timed(action, steps[action])
+    errors.extend(f"script: {message}" for message in session.errors)
+
+
+async def drive(level: int, url: str, args, timings, errors):
+    sessions = []
+    for i in range(level):
+        sessions.append(
+            asyncio.create_task(run_session(args.seed + i, url, args, timings, errors))
+        )
+        await asyncio.sleep(args.ramp / level)
+    await asyncio.gather(*sessions)
+
+
+def run_level(level: int, args) -> dict:
+    """Start a fresh server, drive `level` sessions against it, and summarise"""
+    tmp = tempfile.mkdtemp(prefix="residentcase-load-")
+    port = free_port()
+    server = start_server(port, tmp, args)
+    timings, errors = [], []
+    try:
+        with ProcessSampler(server.pid) as sampler:
+            url = f"ws://localhost:{port}/_stcore/stream"
+            asyncio.run(drive(level, url, args, timings, errors))
+    finally:
+        server.terminate()
+        server.wait()
+
+    by_action = {}
+    for action, elapsed in timings:
+        by_action.setdefault(action, []).append(elapsed)
+    by_action["all"] = [elapsed for _, elapsed in timings]
+    return {
+        "sessions": level,
+        "reruns": len(timings),
+        "errors": len(errors),
+        "first_errors": errors[:3],
+        "latency": {
+            action: {
+                "n": len(values),
+                "p50": percentile(values, 50),
+                "p90": percentile(values, 90),
+                "p99": percentile(values, 99),
+                "max": max(values),
+                "mean": statistics.fmean(values),
+            }
+            for action, values in by_action.items()
+            if values
+        },
+        "peak_rss_mb": sampler.peak_rss / 2**20,
+        "cpu_percent": 100 * sampler.cpu / sampler.wall,
+        "wall": sampler.wall,
+    }
+
+
+def print_report(result: dict):
+    print(
+        f"\n== {result['sessions']} session(s): {result['reruns']} reruns in "
+        f"{result['wall']:.1f}s, {result['errors']} error(s), peak server RSS "
+        f"{result['peak_rss_mb']:.0f} MB, server CPU {result['cpu_percent']:.0f}%"
+    )
+    print(
+        f"{'action':<12} {'n':>6} {'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9} {'max ms':>9}"
+    )
+    for action, stats in result["latency"].items():
+        print(
+            f"{action:<12} {stats['n']:>6} "
+            + " ".join(f"{stats[k] * 1000:>9.0f}" for k in ("p50", "p90", "p99", "max"))
+        )
+    for error in result["first_errors"]:
+        print(f"  ! {error}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, nargs="+", default=[10, 50, 200])
+    parser.add_argument("--actions", type=int, default=15, help="Per session")
+    parser.add_argument("--think", type=float, default=1.0, help="Mean pause (s)")
+    parser.add_argument("--ramp", type=float, default=5.0, help="Start-up spread (s)")
+    parser.add_argument("--teams", type=int, default=20)
+    parser.add_argument("--tally-latency", type=float, default=0.3)
+    parser.add_argument("--groq-latency", type=float, default=1.5)
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="Print raw results")
+    args = parser.parse_args()
+
+    results = []
+    for level in args.sessions:
+        result = run_level(level, args)
+        results.append(result)
+        if not args.json:
+            print_report(result)
+    if args.json:
+        print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Offline pipeline benchmark: replay a recorded cassette through the full warm-up
+
+Usage:
+    python -m residentcase --cassette run.jsonl --record warmup --evaluate
+    python benchmarks/replay.py run.jsonl [--latency-scale 0] [--runs 3] [--profile]
+
+Each run starts from empty temporary stores, so every run syncs and grades
+the same recorded submissions against the same recorded Groq replies. With
+--latency-scale 1 the network time matches the recording; 0 removes it and
+leaves only local processing.
+"""
+
+import argparse
+import cProfile
+import os
+import pstats
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from residentcase import grading, ingest  # noqa: E402
+from residentcase.cassette import (  # noqa: E402
+    MATCH_REQUEST,
+    MATCH_URL,
+    REPLAY,
+    use_cassette,
+)
+from residentcase.config import apply_overrides  # noqa: E402
+from residentcase.warmup import warmup_steps  # noqa: E402
+
+
+def run_once(cassette_path: str, latency_scale: float, match_url: bool = False):
+    """Run every warm-up step in this thread, returning per-step timings"""
+    tmp = tempfile.mkdtemp(prefix="residentcase-replay-")
+    apply_overrides(
+        {
+            "EVAL_STORE_PATH": os.path.join(tmp, "evaluations.sqlite3"),
+            "SUBMISSION_STORE_PATH": os.path.join(tmp, "submissions.sqlite3"),
+            "USE_TALLY_API": True,
+        }
+    )
+    grading._evaluation_store.cache_clear()
+    ingest._submission_sync.cache_clear()
+
+    timings = []
+    with use_cassette(cassette_path, REPLAY, latency_scale, match_url) as cassette:
+        for name, step in warmup_steps(evaluate=True):
+            started = time.perf_counter()
+            detail = step()
+            timings.append((name, time.perf_counter() - started, detail))
+    return timings, cassette
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("cassette")
+    parser.add_argument("--latency-scale", type=float, default=0.0)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument(
+        "--cassette-match", choices=[MATCH_REQUEST, MATCH_URL], default=MATCH_REQUEST
+    )
+    parser.add_argument(
+        "--profile", action="store_true", help="Print the top functions of one run"
+    )
+    args = parser.parse_args()
+    match_url = args.cassette_match == MATCH_URL
+
+    if args.profile:
+        profiler = cProfile.Profile()
+        profiler.runcall(run_once, args.cassette, args.latency_scale, match_url)
+        pstats.Stats(profiler).sort_stats("cumulative").print_stats(25)
+        return
+
+    runs = []
+    for _ in range(args.runs):
+        timings, cassette = run_once(args.cassette, args.latency_scale, match_url)
+        runs.append(timings)
+
+    print(f"{'step':<24} {'median ms':>10}  detail")
+    for index, (name, _, detail) in enumerate(runs[-1]):
+        elapsed = statistics.median(run[index][1] for run in runs)
+        print(f"{name:<24} {elapsed * 1000:>10.1f}  {detail or ''}")
+    total = statistics.median(sum(t for _, t, _ in run) for run in runs)
+    print(
+        f"{len(cassette)} recorded interaction(s), latency x{args.latency_scale}: "
+        f"median {total:.3f}s over {args.runs} run(s)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""Cold-start benchmark: import time of each module in a fresh interpreter
+
+Usage:
+    python benchmarks/startup.py [--runs 7]
+
+Each measurement runs in a new process so nothing is already imported, and
+reports the median wall time plus which heavy dependencies the import pulled
+in. Core modules should stay well under the cost of residentcase.ui, which
+is the only one that loads Streamlit.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY = ("streamlit", "requests", "numpy", "http.server")
+
+# (label, code timed in the child process)
+TARGETS = [
+    ("residentcase.catalog", "import residentcase.catalog"),
+    ("residentcase.ingest", "import residentcase.ingest"),
+    ("residentcase.grading", "import residentcase.grading"),
+    ("residentcase.scoring", "import residentcase.scoring"),
+    ("residentcase.warmup", "import residentcase.warmup"),
+    ("residentcase.ui", "import residentcase.ui"),
+    (
+        "load_cases()",
+        "from residentcase.catalog import load_cases; load_cases()",
+    ),
+    (
+        "provisional_scores()",
+        "from residentcase.catalog import load_cases\n"
+        "from residentcase.scoring import provisional_scores\n"
+        "c = load_cases()[0]; provisional_scores(c['management'], ['metformin'])",
+    ),
+]
+
+CHILD = """
+import json, sys, time
+started = time.perf_counter()
+exec(compile(sys.argv[1], "<bench>", "exec"))
+elapsed = time.perf_counter() - started
+print(json.dumps({"elapsed": elapsed, "loaded": [m for m in sys.argv[2:] if m in sys.modules]}))
+"""
+
+
+def measure(code: str, runs: int):
+    timings, loaded = [], []
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, "-c", CHILD, code, *HEAVY],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        data = json.loads(result.stdout.strip().splitlines()[-1])
+        timings.append(data["elapsed"])
+        loaded = data["loaded"]
+    return statistics.median(timings), loaded
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=7)
+    args = parser.parse_args()
+
+    print(f"{'target':<24} {'median ms':>10}  heavy imports")
+    for label, code in TARGETS:
+        elapsed, loaded = measure(code, args.runs)
+        print(f"{label:<24} {elapsed * 1000:>10.1f}  {', '.join(loaded) or '-'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,8 @@
+"""ResidentCASE: case catalog, Tally ingest, AI grading, and scoring
+
+Submodules are imported on demand and only residentcase.ui depends on
+Streamlit, so workers and command-line tools can use the core directly:
+
+    from residentcase.catalog import load_cases
+    from residentcase.grading import evaluate_response
+"""
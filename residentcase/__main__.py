@@ -0,0 +1,217 @@
+"""Command-line entry point: `python -m residentcase <command>`
+
+    warmup [--evaluate]   Sync Tally, load stored evaluations, optionally grade
+    backfill              Fetch every page of each form's submissions (resumable)
+    regrade [--dry-run]   Regrade evaluations made against an edited case or prompt
+                          (backfill and regrade take --form ID; default all cohorts)
+    prompt-stats          Estimated prompt tokens saved by each compaction stage
+
+Global options record Tally/Groq traffic to a cassette file, or replay it
+offline: --cassette PATH [--record] [--latency-scale 0.1] [--cassette-match url]
+"""
+
+import argparse
+import logging
+import sys
+import time
+from typing import List
+
+from residentcase.cassette import (
+    MATCH_REQUEST,
+    MATCH_URL,
+    RECORD,
+    REPLAY,
+    CassetteMiss,
+    use_cassette,
+)
+from residentcase.catalog import load_cases
+from residentcase.compaction import (
+    STAGES,
+    compact_case_text,
+    compaction_report,
+    estimate_tokens,
+)
+from residentcase.config import get_cohorts
+from residentcase.grading import (
+    EVALUATION_PROMPT,
+    SYSTEM_PROMPT,
+    find_stale_evaluations,
+    prompt_templates,
+    regrade_stale,
+)
+from residentcase.ingest import (
+    BACKFILL_PAGE_SIZE,
+    BACKFILL_WORKERS,
+    backfill_submissions,
+)
+from residentcase.warmup import READY, Warmup, warmup_steps
+
+
+def run_warmup(args) -> int:
+    warmup = Warmup(warmup_steps(evaluate=args.evaluate)).start()
+    warmup.wait()
+    for name, status in warmup.status.items():
+        detail = warmup.details.get(name, "")
+        print(f"{status:>8}  {name}{': ' + detail if detail else ''}")
+    print(f"Finished in {warmup.elapsed:.2f}s")
+    return 0 if all(s == READY for s in warmup.status.values()) else 1
+
+
+def selected_forms(args) -> List[str]:
+    return args.form or list(get_cohorts().values())
+
+
+def run_backfill(args) -> int:
+    failed = 0
+    for form_id in selected_forms(args):
+        started = time.perf_counter()
+
+        def progress(done: int, total: int):
+            print(f"\r{form_id}: {done}/{total} page(s) written", end="", flush=True)
+
+        result = backfill_submissions(
+            form_id=form_id,
+            page_size=args.page_size,
+            max_workers=args.workers,
+            restart=args.restart,
+            progress=progress,
+        )
+        print(
+            f"\n{result['total']} submission(s) across {result['pages']} page(s): "
+            f"{result['fetched']} fetched, {result['skipped']} already done, "
+            f"{len(result['failed'])} failed in {time.perf_counter() - started:.1f}s"
+        )
+        failed += len(result["failed"])
+    if failed:
+        print("Re-run the same command to retry the failed pages.")
+    return 1 if failed else 0
+
+
+def run_regrade(args) -> int:
+    for form_id in selected_forms(args):
+        stale = find_stale_evaluations(form_id=form_id)
+        if args.case:
+            stale = {n: items for n, items in stale.items() if n in args.case}
+        print(f"Form {form_id}:")
+        for case_number, items in sorted(stale.items()):
+            print(f"  Case {case_number}:")
+            for item in items:
+                print(f"    {item['team']}: {', '.join(item['changed'])} changed")
+        if not stale:
+            print("  All stored evaluations are current.")
+        elif not args.dry_run:
+            print(f"  {regrade_stale(sorted(stale), form_id=form_id)}")
+    return 0
+
+
+def run_prompt_stats(args) -> int:
+    cases = load_cases()
+    sources = [
+        ("Case text", [c[k] for c in cases for k in ("description", "management")]),
+        ("Instructions", [SYSTEM_PROMPT, EVALUATION_PROMPT]),
+    ]
+    stages = [name for name, _ in STAGES]
+    print(f"{'~tokens':<14}{'original':>10}" + "".join(f"{s:>12}" for s in stages))
+    for label, texts in sources:
+        report = compaction_report(texts)
+        saved = 1 - report["compacted"] / report["original"]
+        print(
+            f"{label:<14}{report['original']:>10}"
+            + "".join(f"{report[s]:>12}" for s in stages)
+            + f"   ({saved:.0%} saved)"
+        )
+
+    # Prompt size of one grading call, before any team response text
+    def call_tokens(compact: bool) -> float:
+        system, template = prompt_templates(compact)
+        prepare = compact_case_text if compact else str
+        return sum(
+            estimate_tokens(system)
+            + estimate_tokens(
+                template.format(
+                    case_description=prepare(c["description"]),
+                    management_guideline=prepare(c["management"]),
+                    team_response="",
+                )
+            )
+            for c in cases
+        ) / len(cases)
+
+    before, after = call_tokens(False), call_tokens(True)
+    print(
+        f"Per grading call: ~{before:.0f} -> ~{after:.0f} prompt tokens "
+        f"({1 - after / before:.0%} fewer) plus the team's response"
+    )
+    return 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m residentcase")
+    parser.add_argument("--cassette", help="Record or replay HTTP traffic here")
+    parser.add_argument(
+        "--record", action="store_true", help="Record to the cassette (live calls)"
+    )
+    parser.add_argument(
+        "--latency-scale",
+        type=float,
+        default=1.0,
+        help="Scale replayed latencies (0 replays instantly)",
+    )
+    parser.add_argument(
+        "--cassette-match",
+        choices=[MATCH_REQUEST, MATCH_URL],
+        default=MATCH_REQUEST,
+        help="Match replayed requests on the whole request or the URL alone",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    warmup = commands.add_parser("warmup", help="Prewarm the local stores")
+    warmup.add_argument(
+        "--evaluate", action="store_true", help="Also grade ungraded responses"
+    )
+    warmup.set_defaults(func=run_warmup)
+
+    backfill = commands.add_parser(
+        "backfill", help="Fetch all historical submissions into the local store"
+    )
+    backfill.add_argument("--workers", type=int, default=BACKFILL_WORKERS)
+    backfill.add_argument("--page-size", type=int, default=BACKFILL_PAGE_SIZE)
+    backfill.add_argument(
+        "--restart", action="store_true", help="Ignore pages done by an earlier run"
+    )
+    backfill.add_argument("--form", action="append", help="Limit to a Tally form id")
+    backfill.set_defaults(func=run_backfill)
+
+    regrade = commands.add_parser(
+        "regrade", help="Regrade evaluations whose case text or prompt changed"
+    )
+    regrade.add_argument(
+        "--case", type=int, action="append", help="Limit to a case number"
+    )
+    regrade.add_argument("--form", action="append", help="Limit to a Tally form id")
+    regrade.add_argument(
+        "--dry-run", action="store_true", help="List what would be regraded"
+    )
+    regrade.set_defaults(func=run_regrade)
+
+    prompt_stats = commands.add_parser(
+        "prompt-stats", help="Report prompt tokens saved by compaction"
+    )
+    prompt_stats.set_defaults(func=run_prompt_stats)
+
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(message)s")
+    if args.cassette:
+        mode = RECORD if args.record else REPLAY
+        match_url = args.cassette_match == MATCH_URL
+        try:
+            with use_cassette(args.cassette, mode, args.latency_scale, match_url):
+                return args.func(args)
+        except CassetteMiss as e:
+            print(f"Replay failed: {e}", file=sys.stderr)
+            return 2
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
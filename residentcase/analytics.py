@@ -0,0 +1,187 @@
+from typing import TYPE_CHECKING, Dict, List, Tuple
+
+# Cohort analytics over a (teams x cases) score array. Unattempted cases are
+# NaN, so every statistic is taken over attempted cases only and a team is
+# not penalised (or rewarded) for the cases it skipped. NumPy is imported
+# inside the functions, as in scoring.py.
+if TYPE_CHECKING:
+    import numpy as np
+
+# Bootstrap resamples of the case set used for rank confidence
+BOOTSTRAP_SAMPLES = 500
+# Central interval of bootstrap ranks reported as a team's rank range
+RANK_INTERVAL = 0.9
+HISTOGRAM_BINS = 10
+
+
+def score_matrix(
+    team_cases: Dict[str, Dict[int, float]], case_count: int
+) -> Tuple[List[str], "np.ndarray"]:
+    """Team names and their (teams x cases) scores, NaN where not attempted"""
+    import numpy as np
+
+    teams = list(team_cases)
+    rows, columns, values = [], [], []
+    for row, cases in enumerate(team_cases.values()):
+        rows.extend([row] * len(cases))
+        columns.extend(cases.keys())
+        values.extend(cases.values())
+
+    matrix = np.full((len(teams), case_count), np.nan)
+    # Case numbers are 1-based
+    matrix[rows, np.asarray(columns, dtype=int) - 1] = values
+    return teams, matrix
+
+
+def case_zscores(matrix: "np.ndarray") -> "np.ndarray":
+    """Each score's standard deviations from its case's mean (0 if no spread)"""
+    import numpy as np
+
+    attempted = ~np.isnan(matrix)
+    counts = attempted.sum(axis=0)
+    filled = np.where(attempted, matrix, 0.0)
+    means = filled.sum(axis=0) / np.maximum(counts, 1)
+    spread = np.sqrt(
+        np.where(attempted, (filled - means) ** 2, 0.0).sum(axis=0)
+        / np.maximum(counts, 1)
+    )
+    z = (matrix - means) / np.where(spread > 0, spread, 1.0)
+    return np.where(spread > 0, z, np.where(attempted, 0.0, np.nan))
+
+
+def case_percentiles(matrix: "np.ndarray") -> "np.ndarray":
+    """Percentile rank (0-100, ties counted half) of each score within its case
+
+    All cases are ranked in one sort by offsetting each column into its own
+    value range.
+    """
+    import numpy as np
+
+    teams, case_count = matrix.shape
+    attempted = ~np.isnan(matrix)
+    if not attempted.any():
+        return np.full(matrix.shape, np.nan)
+
+    low, high = np.nanmin(matrix), np.nanmax(matrix)
+    span = high - low + 1.0
+    offsets = np.arange(case_count) * span
+    # Unattempted scores sort after every attempted score of their case
+    keys = np.where(attempted, matrix - low, span - 0.5) + offsets
+    ordered = np.sort(keys, axis=None)
+    below = np.searchsorted(ordered, keys, side="left")
+    through = np.searchsorted(ordered, keys, side="right")
+    column_start = np.arange(case_count) * teams
+
+    counts = attempted.sum(axis=0)
+    rank = (below - column_start) + 0.5 * (through - below)
+    percentiles = 100.0 * rank / np.maximum(counts, 1)
+    return np.where(attempted, percentiles, np.nan)
+
+
+def attempted_mean(matrix: "np.ndarray") -> "np.ndarray":
+    """Row means over attempted cases (NaN for a team with none)"""
+    import numpy as np
+
+    attempted = ~np.isnan(matrix)
+    counts = attempted.sum(axis=1)
+    totals = np.where(attempted, matrix, 0.0).sum(axis=1)
+    return np.where(counts > 0, totals / np.maximum(counts, 1), np.nan)
+
+
+def competition_ranks(values: "np.ndarray", axis: int = -1) -> "np.ndarray":
+    """1-based competition ranks, highest first (ties share the best rank); NaN last"""
+    import numpy as np
+
+    keys = np.moveaxis(-np.nan_to_num(values, nan=-np.inf), axis, -1)
+    order = np.argsort(keys, axis=-1, kind="stable")
+    ordered = np.take_along_axis(keys, order, axis=-1)
+    # Each sorted position takes the position where its run of equal values starts
+    new_run = np.ones(ordered.shape, dtype=bool)
+    new_run[..., 1:] = ordered[..., 1:] != ordered[..., :-1]
+    positions = np.arange(keys.shape[-1])
+    starts = np.maximum.accumulate(np.where(new_run, positions, 0), axis=-1)
+    ranks = np.empty_like(order)
+    np.put_along_axis(ranks, order, starts + 1, axis=-1)
+    return np.moveaxis(ranks, -1, axis)
+
+
+def bootstrap_ranks(
+    zscores: "np.ndarray", samples: int = BOOTSTRAP_SAMPLES, seed: int = 0
+) -> "np.ndarray":
+    """(teams x samples) ranks by mean z-score over resampled case sets
+
+    Each sample draws the cases with replacement; a case drawn k times gets
+    weight k, so every sample's team means are one matrix product.
+    """
+    import numpy as np
+
+    teams, case_count = zscores.shape
+    rng = np.random.default_rng(seed)
+    draws = rng.integers(0, case_count, size=(samples, case_count))
+    weights = np.zeros((samples, case_count))
+    np.add.at(weights, (np.arange(samples)[:, None], draws), 1.0)
+
+    # Samples x teams, so each sample's ranking is a contiguous row
+    attempted = ~np.isnan(zscores)
+    totals = weights @ np.where(attempted, zscores, 0.0).T
+    counts = weights @ attempted.T.astype(float)
+    # A team with none of its cases drawn keeps its observed mean
+    observed = attempted_mean(zscores)[None, :]
+    means = np.where(counts > 0, totals / np.maximum(counts, 1.0), observed)
+    return competition_ranks(means).T
+
+
+def score_histograms(matrix: "np.ndarray", bins: int = HISTOGRAM_BINS) -> "np.ndarray":
+    """(cases x bins) counts of attempted 0-100 scores per case"""
+    import numpy as np
+
+    case_count = matrix.shape[1]
+    attempted = ~np.isnan(matrix)
+    bucket = np.clip((np.where(attempted, matrix, 0.0) * bins // 100), 0, bins - 1)
+    cells = (np.arange(case_count) * bins + bucket.astype(int))[attempted]
+    return np.bincount(cells, minlength=case_count * bins).reshape(case_count, bins)
+
+
+def cohort_analytics(
+    team_cases: Dict[str, Dict[int, float]],
+    case_count: int,
+    samples: int = BOOTSTRAP_SAMPLES,
+) -> Dict:
+    """Per-case normalization, attempted-case averages and rank confidence
+
+    Averages (of scores, z-scores and case percentiles) cover attempted cases
+    only. Teams are ranked by their mean z-score over the cases they attempted.
+    The rank range is the central RANK_INTERVAL of their bootstrap ranks
+    and stability the share of resamples that reproduce the observed rank.
+    """
+    import numpy as np
+
+    teams, matrix = score_matrix(team_cases, case_count)
+    zscores = case_zscores(matrix)
+    normalized = attempted_mean(zscores)
+    percentiles = case_percentiles(matrix)
+    rank = competition_ranks(normalized)
+
+    if teams:
+        ranks = bootstrap_ranks(zscores, samples)
+        tail = (1 - RANK_INTERVAL) / 2 * 100
+        rank_low, rank_high = np.percentile(ranks, [tail, 100 - tail], axis=1)
+        stability = (ranks == rank[:, None]).mean(axis=1)
+    else:
+        rank_low = rank_high = stability = np.zeros(0)
+
+    return {
+        "teams": teams,
+        "scores": matrix,
+        "attempted": (~np.isnan(matrix)).sum(axis=1),
+        "average": attempted_mean(matrix),
+        "zscores": zscores,
+        "normalized": normalized,
+        "percentiles": percentiles,
+        "percentile": attempted_mean(percentiles),
+        "rank": rank,
+        "rank_low": np.floor(rank_low).astype(int),
+        "rank_high": np.ceil(rank_high).astype(int),
+        "stability": stability,
+        "histograms": score_histograms(matrix),
+    }
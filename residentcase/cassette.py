@@ -0,0 +1,202 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Dict, List, Optional
+
+from residentcase.config import get_setting
+
+# Every Tally and Groq request goes through http_request(). Normally that is a
+# plain requests call; with a cassette installed the request/response pairs
+# are recorded to (or replayed from) a JSON-lines file, so the whole pipeline
+# can be profiled offline against identical inputs.
+RECORD = "record"
+REPLAY = "replay"
+# How replayed requests are matched to recorded ones: on method, URL, query
+# and JSON body, or on method and URL alone (survives prompt changes)
+MATCH_REQUEST = "request"
+MATCH_URL = "url"
+
+
+class CassetteMiss(Exception):
+    """A replayed request has no recorded interaction
+
+    Callers let it propagate rather than treating it like a network error,
+    so a stale cassette stops a replay instead of skewing its results.
+    """
+
+
+def request_key(method: str, url: str, params=None, json_body=None) -> str:
+    """Identify a request by everything but its headers (which hold API keys)"""
+    data = json.dumps(
+        [method.upper(), url, params or {}, json_body], sort_keys=True, default=str
+    )
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+
+class Cassette:
+    """Recorded request/response pairs stored one JSON object per line
+
+    Recording starts a fresh file. In replay mode, repeated identical requests
+    get the recorded responses in order (the last one repeats), and each reply
+    is delayed by the recorded latency times latency_scale; 0 replays as fast
+    as possible. With
+    match_url set, requests match on method and URL alone, so one recorded
+    reply stands in for every request to that endpoint (as in load tests).
+    """
+
+    def __init__(
+        self,
+        path: str,
+        mode: str = REPLAY,
+        latency_scale: float = 1.0,
+        match_url: bool = False,
+    ):
+        if mode not in (RECORD, REPLAY):
+            raise ValueError(f"Unknown cassette mode: {mode}")
+        self.path = path
+        self.mode = mode
+        self.latency_scale = latency_scale
+        self.match_url = match_url
+        self.interactions: Dict[str, List[Dict]] = {}
+        self.played: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        if mode == REPLAY:
+            self.load()
+        else:
+            # A new recording replaces the old one; appending would leave the
+            # old replies first in line on replay
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            open(self.path, "w", encoding="utf-8").close()
+
+    def load(self):
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    interaction = json.loads(line)
+                    # Any recording can be replayed on URL alone
+                    key = (
+                        request_key(interaction["method"], interaction["url"])
+                        if self.match_url
+                        else interaction["key"]
+                    )
+                    self.interactions.setdefault(key, []).append(interaction)
+
+    def key(self, method: str, url: str, params=None, json_body=None) -> str:
+        if self.match_url:
+            return request_key(method, url)
+        return request_key(method, url, params, json_body)
+
+    def __len__(self) -> int:
+        return sum(len(items) for items in self.interactions.values())
+
+    def record(self, key: str, method: str, url: str, response, elapsed: float):
+        interaction = {
+            "key": key,
+            "method": method.upper(),
+            "url": url,
+            "status": response.status_code,
+            "headers": {"Content-Type": response.headers.get("Content-Type", "")},
+            "body": response.content.decode("utf-8", errors="replace"),
+            "elapsed": round(elapsed, 4),
+        }
+        with self._lock:
+            self.interactions.setdefault(key, []).append(interaction)
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(interaction) + "\n")
+
+    def replay(self, key: str, method: str, url: str):
+        with self._lock:
+            recorded = self.interactions.get(key)
+            if not recorded:
+                raise CassetteMiss(
+                    f"No recorded {method.upper()} {url} in {self.path}; re-record "
+                    "it, or match on URL alone if only the request body changed"
+                )
+            index = self.played.get(key, 0)
+            self.played[key] = index + 1
+        interaction = recorded[min(index, len(recorded) - 1)]
+        if self.latency_scale > 0:
+            time.sleep(interaction["elapsed"] * self.latency_scale)
+        return replayed_response(interaction)
+
+
+def replayed_response(interaction: Dict):
+    """Rebuild a requests.Response so callers' error handling is unchanged"""
+    import requests
+
+    response = requests.Response()
+    response.status_code = interaction["status"]
+    response.url = interaction["url"]
+    response.headers.update(interaction["headers"])
+    response.encoding = "utf-8"
+    response._content = interaction["body"].encode("utf-8")
+    return response
+
+
+_installed: Optional[Cassette] = None
+
+
+def install_cassette(cassette: Optional[Cassette]):
+    """Route http_request() through a cassette, or back to the network (None)"""
+    global _installed
+    _installed = cassette
+
+
+@contextmanager
+def use_cassette(
+    path: str, mode: str = REPLAY, latency_scale: float = 1.0, match_url: bool = False
+):
+    previous = _installed
+    cassette = Cassette(path, mode, latency_scale, match_url)
+    install_cassette(cassette)
+    try:
+        yield cassette
+    finally:
+        install_cassette(previous)
+
+
+@lru_cache(maxsize=None)
+def _configured_cassette(
+    path: str, mode: str, latency_scale: float, match_url: bool
+) -> Cassette:
+    return Cassette(path, mode, latency_scale, match_url)
+
+
+def active_cassette() -> Optional[Cassette]:
+    """The installed cassette, else the one named by the HTTP_CASSETTE setting"""
+    if _installed is not None:
+        return _installed
+    path = get_setting("HTTP_CASSETTE", "")
+    if not path:
+        return None
+    return _configured_cassette(
+        path,
+        get_setting("HTTP_CASSETTE_MODE", REPLAY),
+        float(get_setting("HTTP_CASSETTE_LATENCY", 1.0)),
+        get_setting("HTTP_CASSETTE_MATCH", MATCH_REQUEST) == MATCH_URL,
+    )
+
+
+def http_request(method: str, url: str, session=None, **kwargs):
+    """requests.get/post (or session.get/post) that honours the active cassette"""
+    cassette = active_cassette()
+    if cassette is None:
+        import requests
+
+        return getattr(session or requests, method.lower())(url, **kwargs)
+
+    key = cassette.key(method, url, kwargs.get("params"), kwargs.get("json"))
+    if cassette.mode == REPLAY:
+        return cassette.replay(key, method, url)
+
+    import requests
+
+    started = time.perf_counter()
+    response = getattr(session or requests, method.lower())(url, **kwargs)
+    cassette.record(key, method, url, response, time.perf_counter() - started)
+    return response
@@ -0,0 +1,86 @@
+import os
+import re
+from functools import lru_cache
+from typing import Dict, List
+
+from residentcase.config import BASE_DIR
+
+CASES_FILE = os.path.join(BASE_DIR, "cases.md")
+
+
+def parse_cases_file(file_path: str) -> List[Dict]:
+    """Parse cases.md and extract case information"""
+    with open(file_path, "r", encoding="utf-8") as f:
+        content = f.read()
+
+    cases = []
+
+    # Split by the separator "* * *" (which appears as horizontal rule)
+    # First, split by the actual separator pattern
+    case_blocks = re.split(r"\n\* \* \*\n|\n---\n", content)
+
+    for block in case_blocks:
+        # Skip if doesn't contain a case title
+        if "## Case" not in block:
+            continue
+
+        # Extract case title
+        title_match = re.search(r"## (Case \d+:.*?)(?:\n|$)", block)
+        if not title_match:
+            continue
+        case_title = title_match.group(1).strip()
+
+        # Split by management section header to separate description from management
+        parts = re.split(
+            r"\*\*(?:Management Considerations|Management Plan):\*\*", block, maxsplit=1
+        )
+
+        if len(parts) == 2:
+            description_part = parts[0].strip()
+            management_part = parts[1].strip()
+
+            # The description is everything after the title and before Management Considerations
+            # Clean up the description
+            description = description_part
+
+            # Clean up management text (remove any trailing references section markers)
+            management = management_part
+
+        else:
+            # Fallback if structure is different
+            description_part = block
+            management_part = ""
+            description = description_part
+            management = management_part
+
+        cases.append(
+            {
+                "title": case_title,
+                "description": description,
+                "management": management,
+            }
+        )
+
+    return cases
+
+
+def extract_section(text: str, section_name: str) -> str:
+    """Extract content of a specific section"""
+    # Pattern to match section content until next major section or end
+    pattern = rf"\*\*{re.escape(section_name)}\*\*\s*(.*?)(?=\*\*[A-Z][^:]*:|---|\Z)"
+    match = re.search(pattern, text, re.DOTALL)
+
+    if match:
+        content = match.group(1).strip()
+        return content
+    return ""
+
+
+def load_cases(file_path: str = CASES_FILE) -> List[Dict]:
+    """Parsed case catalog, re-parsed only when the file changes"""
+    return _load_cases(file_path, os.path.getmtime(file_path))
+
+
+@lru_cache(maxsize=4)
+def _load_cases(file_path: str, modified: float) -> List[Dict]:
+    return parse_cases_file(file_path)
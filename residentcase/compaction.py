@@ -0,0 +1,70 @@
+import re
+from functools import lru_cache
+from typing import Callable, Dict, List, Tuple
+
+# Prompt compaction: the case markdown in cases.md is written for people, so
+# most of its whitespace, citation markers and emphasis cost tokens without
+# telling the grader anything. Each stage is a plain str -> str function so
+# the savings of each can be reported separately.
+
+_TRAILING_RE = re.compile(r"[ \t]+$", re.MULTILINE)
+_BLANK_LINES_RE = re.compile(r"\n\s*\n")
+_INNER_SPACES_RE = re.compile(r"(?<=\S)[ \t]{2,}")
+_CITATION_RE = re.compile(r"\s*\\?\[\d+(?:\s*[,\-–]\s*\d+)*\\?\]")
+_EMPHASIS_RE = re.compile(r"\*\*|__")
+_HEADING_RE = re.compile(r"^#{1,6}\s+", re.MULTILINE)
+_RULE_RE = re.compile(r"^\s*(?:-{3,}|\*{3,}|_{3,})\s*$\n?", re.MULTILINE)
+
+
+def normalize_whitespace(text: str) -> str:
+    """Drop trailing spaces and blank or whitespace-only lines"""
+    text = _TRAILING_RE.sub("", text)
+    text = _BLANK_LINES_RE.sub("\n", text)
+    return _INNER_SPACES_RE.sub(" ", text).strip()
+
+
+def strip_citations(text: str) -> str:
+    """Remove reference markers such as \\[1\\]\\[2\\] and [3]"""
+    return _CITATION_RE.sub("", text)
+
+
+def strip_markdown(text: str) -> str:
+    """Remove emphasis, heading markers and horizontal rules; bullets stay"""
+    text = _RULE_RE.sub("", text)
+    text = _HEADING_RE.sub("", text)
+    return _EMPHASIS_RE.sub("", text)
+
+
+STAGES: List[Tuple[str, Callable[[str], str]]] = [
+    ("whitespace", normalize_whitespace),
+    ("citations", strip_citations),
+    ("markdown", strip_markdown),
+]
+
+
+def compact_text(text: str) -> str:
+    for _, stage in STAGES:
+        text = stage(text)
+    # Removing markers can leave new blank lines and trailing spaces behind
+    return normalize_whitespace(text)
+
+
+@lru_cache(maxsize=64)
+def compact_case_text(text: str) -> str:
+    """compact_text() cached by content, so each case is compacted once"""
+    return compact_text(text)
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about four characters per token for English)"""
+    return (len(text) + 3) // 4
+
+
+def compaction_report(texts: List[str]) -> Dict[str, int]:
+    """Estimated tokens before compaction and after each stage, summed over texts"""
+    report = {"original": sum(estimate_tokens(t) for t in texts)}
+    for name, stage in STAGES:
+        texts = [stage(t) for t in texts]
+        report[name] = sum(estimate_tokens(t) for t in texts)
+    report["compacted"] = sum(estimate_tokens(normalize_whitespace(t)) for t in texts)
+    return report
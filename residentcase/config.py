@@ -0,0 +1,76 @@
+import os
+from functools import lru_cache
+from typing import Any, Dict, Mapping
+
+# Settings are shared by the Streamlit app and the command-line tools.
+# The tools run outside Streamlit, so they read .streamlit/secrets.toml directly;
+# the app additionally applies st.secrets as overrides.
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SECRETS_PATH = os.path.join(BASE_DIR, ".streamlit", "secrets.toml")
+
+DEFAULT_FORM_ID = "b5xGbZ"
+
+_overrides: Dict[str, Any] = {}
+
+
+@lru_cache(maxsize=4)
+def load_secrets(path: str = SECRETS_PATH) -> Dict:
+    """Read the Streamlit secrets file, returning an empty dict if it is missing"""
+    # Imported here: the TOML parser costs as much as the rest of the config
+    import tomllib
+
+    try:
+        with open(path, "rb") as f:
+            return tomllib.load(f)
+    except (OSError, tomllib.TOMLDecodeError):
+        return {}
+
+
+def apply_overrides(settings: Mapping[str, Any]):
+    """Prefer settings supplied by the host application (e.g. st.secrets)"""
+    _overrides.update(settings)
+
+
+def secrets_configured() -> bool:
+    return bool(_overrides or load_secrets())
+
+
+def get_setting(name: str, default: Any = None) -> Any:
+    """Look up a setting in the overrides and secrets.toml, then the environment"""
+    if name in _overrides:
+        return _overrides[name]
+    secrets = load_secrets()
+    if name in secrets:
+        return secrets[name]
+    return os.getenv(name, default)
+
+
+def default_form_id() -> str:
+    return get_setting("TALLY_FORM_ID", DEFAULT_FORM_ID)
+
+
+def get_cohorts() -> Dict[str, str]:
+    """Cohort name -> Tally form id, in sidebar order
+
+    Read from a [COHORTS] table ("name" = "form id"), else from
+    TALLY_FORM_IDS (a list, or comma-separated in the environment), else the
+    single TALLY_FORM_ID form.
+    """
+    cohorts = get_setting("COHORTS")
+    if isinstance(cohorts, Mapping) and cohorts:
+        return {str(name): str(form_id) for name, form_id in cohorts.items()}
+    form_ids = get_setting("TALLY_FORM_IDS")
+    if isinstance(form_ids, str):
+        form_ids = [f.strip() for f in form_ids.split(",") if f.strip()]
+    if form_ids:
+        return {form_id: form_id for form_id in form_ids}
+    form_id = default_form_id()
+    return {form_id: form_id}
+
+
+def get_bool_setting(name: str, default: bool = False) -> bool:
+    """Boolean setting; environment variables use "true"/"false" strings"""
+    value = get_setting(name, default)
+    if isinstance(value, str):
+        return value.strip().lower() in ("1", "true", "yes", "on")
+    return bool(value)
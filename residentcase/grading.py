@@ -0,0 +1,614 @@
+import hashlib
+import re
+import time
+import weakref
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+from residentcase.cassette import CassetteMiss, http_request
+from residentcase.catalog import load_cases
+from residentcase.compaction import compact_case_text, compact_text
+from residentcase.config import default_form_id, get_bool_setting, get_setting
+from residentcase.ingest import (
+    categorize_responses_by_case,
+    deduplicate_responses,
+    for_each_form,
+    get_submissions,
+)
+from residentcase.metrics import (
+    CACHE_LOOKUPS,
+    EVALUATIONS,
+    GRADING_IN_FLIGHT,
+    GRADING_QUEUE_DEPTH,
+    GROQ_RATE_LIMITED,
+    GROQ_REQUEST_SECONDS,
+    GROQ_RETRIES,
+    GROQ_TOKENS,
+    ZERO_SCORED,
+)
+from residentcase.notify import notify
+from residentcase.resilience import CircuitBreaker, DeadlineBudget
+from residentcase.store import EvaluationStore, response_hash
+
+GROQ_API_BASE = "https://api.groq.com/openai/v1"
+GROQ_MODEL = "llama-3.3-70b-versatile"
+
+# Seconds one Groq request may take, and the default overall deadline for a
+# batch such as "Evaluate All" (shared by its calls)
+REQUEST_TIMEOUT = 30
+BATCH_DEADLINE = 180
+
+# Sampling settings sent with every grading request
+GRADING_TEMPERATURE = 0.1
+GRADING_MAX_TOKENS = 2048
+
+SCORE_RE = re.compile(r"SCORE:\s*(\d+)")
+
+SYSTEM_PROMPT = (
+    "You are a strict medical education evaluator. Your job is to critically assess "
+    "resident physicians' responses against a reference answer. You must be rigorous and "
+    "discriminating — scores should reflect the actual quality of the response. "
+    "Do NOT inflate scores. A response that only partially addresses the reference "
+    "should score 40-60. A response missing major points should score below 40. "
+    "Only award high scores (80+) for responses that are thorough and accurate. "
+    "Different teams should receive meaningfully different scores based on their responses."
+)
+
+EVALUATION_PROMPT = """You are evaluating a medical resident's case response against a reference answer.
+
+**Case Background:**
+{case_description}
+
+**REFERENCE ANSWER (Evidence-Based Management):**
+{management_guideline}
+
+**Team's Response to Evaluate:**
+{team_response}
+
+---
+STRICT EVALUATION PROTOCOL — follow every step:
+
+**STEP 1 — CHECKLIST:** Read the Reference Answer above. List each distinct management point from the reference (number them 1, 2, 3...). For each point, mark whether the team's response addressed it: [HIT], [PARTIAL], or [MISSED].
+
+**STEP 2 — TALLY:** Count your HITs, PARTIALs, and MISSEDs.
+
+**STEP 3 — SCORE CALCULATION:**
+- Each HIT = full points, each PARTIAL = half points, each MISSED = 0
+- Base score = (HITs + 0.5×PARTIALs) / total points × 70  (covers 70 points)
+- Accuracy/safety penalty: deduct up to 20 points for incorrect, dangerous, or missing safety-critical recommendations
+- Organization bonus: up to 10 points for clear, well-structured, complete reasoning
+- Final score = base score + accuracy/safety + organization (0–100)
+
+**STEP 4 — SCORING RULES (strictly enforce):**
+- 80–100: Addresses nearly all reference points correctly with good reasoning
+- 60–79: Addresses most points but misses some important ones
+- 40–59: Addresses some points but misses half or more of the key recommendations
+- 20–39: Only addresses a few points; significant gaps in management
+- 0–19: Largely irrelevant, incorrect, or missing critical safety considerations
+
+**IMPORTANT**: Be discriminating. If the response is vague or generic without naming specific interventions, score it LOW (below 50). Do not give high scores just for using medical-sounding language.
+
+**OUTPUT FORMAT (use exactly this format):**
+
+CHECKLIST:
+1. [management point from reference] — [HIT/PARTIAL/MISSED]
+2. [management point from reference] — [HIT/PARTIAL/MISSED]
+(continue for all reference points)
+
+TALLY: [X] HITs, [Y] PARTIALs, [Z] MISSEDs out of [total] points
+
+SCORE: [number 0-100]
+
+STRENGTHS:
+- [specific points correctly addressed]
+
+AREAS FOR IMPROVEMENT:
+- [specific gaps or errors]
+
+KEY POINTS MISSED:
+- [reference points not addressed]
+
+CLINICAL REASONING:
+[2-3 sentences assessing quality of clinical reasoning]
+"""
+
+
+def prompt_compaction() -> bool:
+    return get_bool_setting("PROMPT_COMPACTION", True)
+
+
+@lru_cache(maxsize=2)
+def prompt_templates(compact: bool) -> Tuple[str, str]:
+    """System and evaluation prompts as sent, optionally compacted"""
+    if not compact:
+        return SYSTEM_PROMPT, EVALUATION_PROMPT
+    return compact_text(SYSTEM_PROMPT), compact_text(EVALUATION_PROMPT)
+
+
+# Stored evaluations record what they were graded against, so editing a case
+# or the prompt only invalidates the evaluations that depend on the change
+@lru_cache(maxsize=2)
+def _prompt_version(compact: bool) -> str:
+    system, template = prompt_templates(compact)
+    data = system + template + ("compact" if compact else "")
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()[:12]
+
+
+def prompt_version() -> str:
+    return _prompt_version(prompt_compaction())
+
+
+def build_prompt(
+    case_description: str,
+    management_guideline: str,
+    team_response: str,
+    compact: Optional[bool] = None,
+) -> Tuple[str, str]:
+    """(system, user) messages for grading one response
+
+    compact defaults to the PROMPT_COMPACTION setting.
+    """
+    if compact is None:
+        compact = prompt_compaction()
+    system, template = prompt_templates(compact)
+    if compact:
+        # Case text repeats for every team, so its compacted form is cached
+        case_description = compact_case_text(case_description)
+        management_guideline = compact_case_text(management_guideline)
+        team_response = compact_text(team_response)
+    prompt = template.format(
+        case_description=case_description,
+        management_guideline=management_guideline,
+        team_response=team_response,
+    )
+    return system, prompt
+
+
+def groq_headers() -> Dict[str, str]:
+    return {
+        "Authorization": f"Bearer {get_setting('GROQ_API_KEY', '')}",
+        "Content-Type": "application/json",
+    }
+
+
+def probe_groq() -> bool:
+    """Cheap request used to tell when Groq has recovered"""
+    response = http_request(
+        "GET", f"{GROQ_API_BASE}/models", headers=groq_headers(), timeout=10
+    )
+    return response.status_code == 200
+
+
+@lru_cache(maxsize=None)
+def get_grading_breaker() -> CircuitBreaker:
+    """Circuit breaker shared by every grading call in this server process"""
+    return CircuitBreaker(probe_groq)
+
+
+# Budgets of the grading batches still running; their unspent calls are the
+# responses waiting to be graded
+_active_budgets = weakref.WeakSet()
+
+
+def batch_budget(calls: int) -> DeadlineBudget:
+    """Deadline for grading `calls` responses as one batch"""
+    budget = DeadlineBudget(
+        float(get_setting("GRADING_DEADLINE", BATCH_DEADLINE)), calls
+    )
+    _active_budgets.add(budget)
+    return budget
+
+
+def grading_queue_depth() -> float:
+    waiting = sum(budget.calls_left for budget in list(_active_budgets))
+    return waiting + GRADING_IN_FLIGHT.value()
+
+
+GRADING_QUEUE_DEPTH.set_function(grading_queue_depth)
+
+
+def completion_payload(
+    system: str,
+    prompt: str,
+    model: str = GROQ_MODEL,
+    temperature: float = GRADING_TEMPERATURE,
+    max_tokens: int = GRADING_MAX_TOKENS,
+) -> Dict:
+    """Chat completion request body for one grading call"""
+    return {
+        "model": model,
+        "messages": [
+            {"role": "system", "content": system},
+            {"role": "user", "content": prompt},
+        ],
+        "temperature": temperature,
+        "max_tokens": max_tokens,
+    }
+
+
+def parse_evaluation(evaluation_text: str) -> Dict:
+    """Split the grader's reply into its sections; the score is 0 if missing"""
+    score_match = SCORE_RE.search(evaluation_text)
+    score = int(score_match.group(1)) if score_match else 0
+
+    checklist_match = re.search(
+        r"CHECKLIST:(.*?)(?=TALLY:|SCORE:|\Z)",
+        evaluation_text,
+        re.DOTALL,
+    )
+    checklist = checklist_match.group(1).strip() if checklist_match else ""
+
+    tally_match = re.search(r"TALLY:(.*?)(?=SCORE:|\Z)", evaluation_text, re.DOTALL)
+    tally = tally_match.group(1).strip() if tally_match else ""
+
+    strengths_match = re.search(
+        r"STRENGTHS:(.*?)(?=AREAS FOR IMPROVEMENT:|KEY POINTS MISSED:|CLINICAL REASONING:|\Z)",
+        evaluation_text,
+        re.DOTALL,
+    )
+    strengths = strengths_match.group(1).strip() if strengths_match else ""
+
+    improvements_match = re.search(
+        r"AREAS FOR IMPROVEMENT:(.*?)(?=KEY POINTS MISSED:|CLINICAL REASONING:|\Z)",
+        evaluation_text,
+        re.DOTALL,
+    )
+    improvements = improvements_match.group(1).strip() if improvements_match else ""
+
+    missed_match = re.search(
+        r"KEY POINTS MISSED:(.*?)(?=CLINICAL REASONING:|\Z)",
+        evaluation_text,
+        re.DOTALL,
+    )
+    missed = missed_match.group(1).strip() if missed_match else ""
+
+    reasoning_match = re.search(
+        r"CLINICAL REASONING:(.*?)(?=\Z)", evaluation_text, re.DOTALL
+    )
+    reasoning = reasoning_match.group(1).strip() if reasoning_match else ""
+
+    return {
+        "score": score,
+        "checklist": checklist,
+        "tally": tally,
+        "strengths": strengths,
+        "improvements": improvements,
+        "missed_points": missed,
+        "clinical_reasoning": reasoning,
+        "full_evaluation": evaluation_text,
+    }
+
+
+def post_completion(payload: Dict, timeout: float):
+    """POST a chat completion, recording its latency and any rate limiting"""
+    started = time.perf_counter()
+    try:
+        response = http_request(
+            "POST",
+            f"{GROQ_API_BASE}/chat/completions",
+            json=payload,
+            headers=groq_headers(),
+            timeout=timeout,
+        )
+    except Exception:
+        GROQ_REQUEST_SECONDS.observe(time.perf_counter() - started, status="error")
+        raise
+    GROQ_REQUEST_SECONDS.observe(
+        time.perf_counter() - started, status=str(response.status_code)
+    )
+    if response.status_code == 429:
+        GROQ_RATE_LIMITED.inc()
+    return response
+
+
+def rate_response_with_gemini(
+    case_description: str,
+    management_guideline: str,
+    team_response: str,
+    deadline: Optional[float] = None,
+) -> Dict:
+    """Use Groq API to rate and score a team's response
+
+    Gives up with a pending evaluation when the circuit breaker is open or
+    the deadline (a time.monotonic() value) would pass before an answer.
+    """
+    import requests
+
+    max_retries = 3
+    retry_delay = 5  # Initial delay in seconds
+    breaker = get_grading_breaker()
+
+    for attempt in range(max_retries):
+        if not breaker.allow():
+            return pending_evaluation(
+                "AI grading is paused while Groq is failing; it will resume automatically"
+            )
+        timeout = REQUEST_TIMEOUT
+        if deadline is not None:
+            timeout = min(timeout, deadline - time.monotonic())
+            if timeout <= 0:
+                return pending_evaluation("Grading deadline reached")
+
+        try:
+            system, prompt = build_prompt(
+                case_description, management_guideline, team_response
+            )
+
+            # Use Groq API with Llama 3.3 70B
+            payload = completion_payload(system, prompt)
+
+            response = post_completion(payload, timeout)
+            response.raise_for_status()
+            breaker.record(True)
+
+            result = response.json()
+            usage = result.get("usage") or {}
+            for kind in ("prompt", "completion"):
+                GROQ_TOKENS.inc(usage.get(f"{kind}_tokens", 0), kind=kind)
+            evaluation_text = result["choices"][0]["message"]["content"]
+
+            return parse_evaluation(evaluation_text)
+
+        except requests.exceptions.HTTPError as e:
+            # Other 4xx replies are caused by our own request, not by Groq
+            if e.response.status_code >= 500 or e.response.status_code == 429:
+                breaker.record(False)
+            # Handle 429 (rate limit) errors with retry
+            if e.response.status_code == 429 and attempt < max_retries - 1:
+                wait_time = retry_delay * (2**attempt)  # Exponential backoff
+                if deadline is not None and time.monotonic() + wait_time >= deadline:
+                    return pending_evaluation(
+                        "Rate limited and out of time for this batch"
+                    )
+                notify(
+                    "warning",
+                    f"⏳ Rate limit reached. Retrying in {wait_time} seconds... (Attempt {attempt + 1}/{max_retries})",
+                )
+                time.sleep(wait_time)
+                GROQ_RETRIES.inc()
+                continue  # Retry
+            else:
+                # Final attempt failed or other HTTP error
+                notify("error", f"Error rating response: {e}")
+                return error_evaluation(
+                    "Error occurred during evaluation", f"Error: {e}"
+                )
+
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+            # A call cut short by the batch deadline says nothing about Groq
+            truncated = (
+                isinstance(e, requests.exceptions.Timeout) and timeout < REQUEST_TIMEOUT
+            )
+            if not truncated:
+                breaker.record(False)
+            notify("error", f"Error rating response: {e}")
+            return pending_evaluation(f"Groq unavailable: {e}")
+
+        except CassetteMiss:
+            raise
+
+        except Exception as e:
+            notify("error", f"Error rating response: {e}")
+            return error_evaluation("Error occurred during evaluation", f"Error: {e}")
+
+    # If all retries failed (should not reach here, but for safety)
+    return error_evaluation(
+        "All retry attempts failed", "Error: Maximum retries exceeded"
+    )
+
+
+def error_evaluation(strengths: str, full_evaluation: str) -> Dict:
+    """Placeholder evaluation returned when the grading call fails"""
+    return {
+        "score": 0,
+        "checklist": "",
+        "tally": "",
+        "strengths": strengths,
+        "improvements": "",
+        "missed_points": "",
+        "clinical_reasoning": "",
+        "full_evaluation": full_evaluation,
+        "error": True,
+    }
+
+
+def pending_evaluation(reason: str) -> Dict:
+    """Evaluation for a response that was not graded in time; retried later"""
+    return {**error_evaluation(reason, reason), "pending": True}
+
+
+def get_evaluation_store(form_id: Optional[str] = None) -> EvaluationStore:
+    """Evaluation store shared by every session in this server process
+
+    Each cohort's form has its own store, so evaluations never mix.
+    """
+    return _evaluation_store(form_id or default_form_id())
+
+
+@lru_cache(maxsize=None)
+def _evaluation_store(form_id: str) -> EvaluationStore:
+    return EvaluationStore(form_id=form_id)
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+
+
+def evaluation_inputs(case: Dict) -> Dict[str, str]:
+    """Fingerprints of everything besides the response that a grade depends on"""
+    return {
+        "description": text_hash(case["description"]),
+        "management": text_hash(case["management"]),
+        "prompt": prompt_version(),
+        "model": GROQ_MODEL,
+    }
+
+
+def changed_inputs(evaluation: Dict, case: Dict) -> List[str]:
+    """Names of the inputs that changed since the evaluation was graded
+
+    Evaluations stored before inputs were recorded are treated as current,
+    so upgrading does not regrade everything at once.
+    """
+    recorded = evaluation.get("inputs")
+    if not recorded:
+        return []
+    current = evaluation_inputs(case)
+    return [name for name, value in current.items() if recorded.get(name) != value]
+
+
+def evaluate_response(
+    case_number: int,
+    case: Dict,
+    team_response: str,
+    force: bool = False,
+    deadline: Optional[float] = None,
+    form_id: Optional[str] = None,
+) -> Dict:
+    """Evaluate a response, reusing the stored evaluation for identical text
+
+    A stored evaluation is only reused while the case text, prompt and model
+    it was graded against are unchanged. Responses that could not be graded
+    come back with "pending" set and a provisional score.
+    """
+    store = get_evaluation_store(form_id)
+    digest = response_hash(team_response)
+
+    if not force:
+        evaluation = store.get(case_number, digest)
+        if evaluation is not None and not changed_inputs(evaluation, case):
+            CACHE_LOOKUPS.inc(result="hit")
+            return evaluation
+        CACHE_LOOKUPS.inc(result="miss")
+
+    GRADING_IN_FLIGHT.inc()
+    try:
+        evaluation = rate_response_with_gemini(
+            case["description"], case["management"], team_response, deadline
+        )
+    finally:
+        GRADING_IN_FLIGHT.dec()
+    if evaluation.get("pending"):
+        EVALUATIONS.inc(outcome="pending")
+    elif evaluation.get("error"):
+        EVALUATIONS.inc(outcome="failed")
+    else:
+        EVALUATIONS.inc(outcome="completed")
+        if evaluation["score"] == 0:
+            ZERO_SCORED.inc()
+
+    if evaluation.get("error"):
+        from residentcase.scoring import provisional_evaluation
+
+        # Fall back to the offline scorer; failed calls are not stored so the
+        # next attempt grades them again
+        reason = evaluation["full_evaluation"]
+        evaluation = provisional_evaluation(case["management"], team_response)
+        evaluation.update(pending=True, pending_reason=reason)
+    else:
+        evaluation["inputs"] = evaluation_inputs(case)
+        store.put(case_number, digest, {**evaluation, "response_hash": digest})
+    evaluation["response_hash"] = digest
+    return evaluation
+
+
+def find_stale_evaluations(
+    cases: Optional[List[Dict]] = None,
+    submissions: Optional[List[Dict]] = None,
+    form_id: Optional[str] = None,
+) -> Dict[int, List[Dict]]:
+    """Latest responses whose stored evaluation depends on a changed input
+
+    Returns {case_number: [{"team", "response", "changed"}]} for the cases
+    that have any; cases whose text is unchanged are never listed.
+    """
+    cases = cases if cases is not None else load_cases()
+    if submissions is None:
+        submissions = get_submissions(form_id=form_id)
+    store = get_evaluation_store(form_id)
+    stale = {}
+
+    for case_idx, case in enumerate(cases):
+        case_number = case_idx + 1
+        case_responses = deduplicate_responses(
+            categorize_responses_by_case(submissions, case_number)
+        )
+        for response_data in case_responses:
+            evaluation = store.get(
+                case_number, response_hash(response_data["response"])
+            )
+            changed = changed_inputs(evaluation, case) if evaluation else []
+            if changed:
+                stale.setdefault(case_number, []).append(
+                    {
+                        "team": response_data["team"],
+                        "response": response_data["response"],
+                        "changed": changed,
+                    }
+                )
+
+    return stale
+
+
+def regrade_stale(
+    case_numbers: Optional[List[int]] = None,
+    cases_file: Optional[str] = None,
+    form_id: Optional[str] = None,
+) -> str:
+    """Regrade only the evaluations invalidated by a case or prompt change"""
+    cases = load_cases(cases_file) if cases_file else load_cases()
+    regraded = pending = 0
+
+    stale = find_stale_evaluations(cases, form_id=form_id)
+    for case_number, items in stale.items():
+        if case_numbers is not None and case_number not in case_numbers:
+            continue
+        for item in items:
+            evaluation = evaluate_response(
+                case_number, cases[case_number - 1], item["response"], form_id=form_id
+            )
+            if evaluation.get("pending"):
+                pending += 1
+            else:
+                regraded += 1
+
+    return f"{regraded} evaluation(s) regraded" + (
+        f", {pending} pending" if pending else ""
+    )
+
+
+def evaluate_ungraded(
+    cases_file: Optional[str] = None, form_id: Optional[str] = None
+) -> str:
+    """Grade every latest response that has no current stored evaluation"""
+    cases = load_cases(cases_file) if cases_file else load_cases()
+    submissions = get_submissions(form_id=form_id)
+    store = get_evaluation_store(form_id)
+    graded = pending = 0
+
+    for case_idx, case in enumerate(cases):
+        case_number = case_idx + 1
+        case_responses = deduplicate_responses(
+            categorize_responses_by_case(submissions, case_number)
+        )
+        for response_data in case_responses:
+            digest = response_hash(response_data["response"])
+            evaluation = store.get(case_number, digest)
+            if evaluation is None or changed_inputs(evaluation, case):
+                evaluation = evaluate_response(
+                    case_number, case, response_data["response"], form_id=form_id
+                )
+                if evaluation.get("pending"):
+                    pending += 1
+                else:
+                    graded += 1
+
+    return f"{graded} response(s) graded" + (f", {pending} pending" if pending else "")
+
+
+def evaluate_all_forms() -> str:
+    """Grade ungraded responses for every cohort, with the forms in parallel"""
+    results = for_each_form(lambda form_id: evaluate_ungraded(form_id=form_id))
+    if len(results) == 1:
+        return str(next(iter(results.values())))
+    return "; ".join(f"{form_id}: {result}" for form_id, result in results.items())
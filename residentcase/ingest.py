@@ -0,0 +1,425 @@
+import math
+import threading
+import time
+from functools import lru_cache, partial
+from typing import Callable, Dict, List, Optional
+
+from residentcase.cassette import CassetteMiss, http_request
+from residentcase.config import (
+    default_form_id,
+    get_bool_setting,
+    get_cohorts,
+    get_setting,
+    secrets_configured,
+)
+from residentcase.metrics import (
+    SUBMISSIONS_INGESTED,
+    TALLY_FETCH_FAILURES,
+    TALLY_FETCH_SECONDS,
+)
+from residentcase.notify import notify
+from residentcase.store import SubmissionStore
+
+TALLY_API_BASE = "https://api.tally.so"
+
+# How long (seconds) a synced copy of the Tally submissions is reused
+SUBMISSION_TTL = 30
+
+# Seconds a single Tally request may take
+REQUEST_TIMEOUT = 30
+
+# Backfill defaults: submissions per page and concurrent page requests
+BACKFILL_PAGE_SIZE = 500
+BACKFILL_WORKERS = 4
+BACKFILL_RETRIES = 4
+
+TALLY_AUTH_HELP = """
+            - The API key needs to be regenerated in Tally settings
+            - The form might need different access permissions
+            - The API key might be for a different form
+
+            **To fix this:**
+            1. Go to Tally.so → Settings → Integrations
+            2. Generate a new API key
+            3. Update TALLY_API_KEY in .streamlit/secrets.toml
+            4. Or use the demo mode below
+            """
+
+
+def tally_api_url(form_id: Optional[str] = None) -> str:
+    form_id = form_id or default_form_id()
+    return f"{TALLY_API_BASE}/forms/{form_id}/submissions"
+
+
+def tally_headers() -> Dict[str, str]:
+    return {
+        "Authorization": f"Bearer {get_setting('TALLY_API_KEY', '')}",
+        "Content-Type": "application/json",
+    }
+
+
+def fetch_tally_responses(form_id: Optional[str] = None) -> List[Dict]:
+    """Fetch responses from Tally.so API"""
+    if not get_bool_setting("USE_TALLY_API", secrets_configured()):
+        return []
+
+    import requests
+
+    form_id = form_id or default_form_id()
+    started = time.perf_counter()
+    try:
+        response = http_request(
+            "GET",
+            tally_api_url(form_id),
+            headers=tally_headers(),
+            timeout=REQUEST_TIMEOUT,
+        )
+        TALLY_FETCH_SECONDS.observe(time.perf_counter() - started, form=form_id)
+        response.raise_for_status()
+        data = response.json()
+        # Tally API returns submissions array, not data array
+        submissions = data.get("submissions", [])
+        SUBMISSIONS_INGESTED.inc(len(submissions), form=form_id)
+        return submissions
+    except requests.exceptions.HTTPError as e:
+        TALLY_FETCH_FAILURES.inc(form=form_id, reason=str(e.response.status_code))
+        if e.response.status_code == 401:
+            notify("warning", "⚠️ Tally API authentication failed. This could mean:")
+            notify("info", TALLY_AUTH_HELP)
+        else:
+            notify("error", f"HTTP Error: {e}")
+        return []
+    except CassetteMiss:
+        raise
+    except Exception as e:
+        TALLY_FETCH_FAILURES.inc(form=form_id, reason=type(e).__name__)
+        notify("error", f"Error fetching Tally responses: {e}")
+        return []
+
+
+def fetch_tally_page(
+    page: int, limit: int, form_id: Optional[str] = None, session=None
+) -> Dict:
+    """Fetch one page of submissions, backing off when rate limited"""
+    form_id = form_id or default_form_id()
+    for attempt in range(BACKFILL_RETRIES):
+        started = time.perf_counter()
+        try:
+            response = http_request(
+                "GET",
+                tally_api_url(form_id),
+                session=session,
+                headers=tally_headers(),
+                params={"page": page, "limit": limit},
+                timeout=REQUEST_TIMEOUT,
+            )
+        except Exception as e:
+            TALLY_FETCH_FAILURES.inc(form=form_id, reason=type(e).__name__)
+            raise
+        TALLY_FETCH_SECONDS.observe(time.perf_counter() - started, form=form_id)
+        if response.status_code >= 400:
+            TALLY_FETCH_FAILURES.inc(form=form_id, reason=str(response.status_code))
+        if response.status_code == 429 and attempt < BACKFILL_RETRIES - 1:
+            time.sleep(2**attempt)
+            continue
+        response.raise_for_status()
+        data = response.json()
+        SUBMISSIONS_INGESTED.inc(len(data.get("submissions", [])), form=form_id)
+        return data
+
+
+def backfill_submissions(
+    store: Optional[SubmissionStore] = None,
+    form_id: Optional[str] = None,
+    page_size: int = BACKFILL_PAGE_SIZE,
+    max_workers: int = BACKFILL_WORKERS,
+    restart: bool = False,
+    progress: Optional[Callable[[int, int], None]] = None,
+) -> Dict:
+    """Fetch every page of a form's submissions into the local store
+
+    The first page reports the total, so the remaining pages are fetched
+    concurrently with at most max_workers requests in flight. Each page is
+    written (and marked done) as it arrives, and a later call resumes by
+    skipping pages already done unless restart is set.
+    """
+    import requests
+    from concurrent.futures import ThreadPoolExecutor, as_completed
+
+    form_id = form_id or default_form_id()
+    store = store or get_submission_sync(form_id).store
+    run = f"{form_id}:{page_size}"
+    session = requests.Session()
+
+    first = fetch_tally_page(1, page_size, form_id, session)
+    counts = first.get("totalNumberOfSubmissionsPerFilter") or {}
+    total = counts.get("all")
+    if total is None:
+        # No total to plan with: fall back to walking the pages in order
+        return _backfill_sequential(store, run, first, page_size, form_id, session)
+    pages = max(1, math.ceil(total / page_size))
+
+    previous_total, done = (None, set()) if restart else store.backfill_state(run)
+    todo = {page for page in range(2, pages + 1) if page not in done}
+    # Tally lists newest first, so submissions that arrived since an interrupted
+    # run push older ones onto later pages; refetch the pages they can reach
+    shift = math.ceil(max(0, total - (previous_total or total)) / page_size)
+    todo |= {
+        later
+        for page in todo | {1}
+        for later in range(page + 1, min(pages, page + shift) + 1)
+    }
+    store.start_backfill(run, total, done - todo)
+    store.write_page(run, 1, first.get("submissions", []))
+
+    written, failed = 1, []
+    if progress:
+        progress(written, len(todo) + 1)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {
+            pool.submit(fetch_tally_page, page, page_size, form_id, session): page
+            for page in sorted(todo)
+        }
+        for future in as_completed(futures):
+            page = futures[future]
+            try:
+                data = future.result()
+            except CassetteMiss:
+                raise
+            except Exception as e:
+                # Left unmarked, so the next run picks it up again
+                notify("error", f"Backfill page {page} failed: {e}")
+                failed.append(page)
+                continue
+            store.write_page(run, page, data.get("submissions", []))
+            written += 1
+            if progress:
+                progress(written, len(todo) + 1)
+
+    return {
+        "total": total,
+        "pages": pages,
+        "fetched": written,
+        "skipped": pages - 1 - len(todo),
+        "failed": sorted(failed),
+    }
+
+
+def _backfill_sequential(store, run, first, page_size, form_id, session) -> Dict:
+    page, data = 1, first
+    store.write_page(run, page, data.get("submissions", []))
+    while data.get("hasMore"):
+        page += 1
+        data = fetch_tally_page(page, page_size, form_id, session)
+        store.write_page(run, page, data.get("submissions", []))
+    return {
+        "total": store.count(),
+        "pages": page,
+        "fetched": page,
+        "skipped": 0,
+        "failed": [],
+    }
+
+
+class SubmissionSync:
+    """Keeps the local submission store in step with Tally
+
+    One instance is shared per process; sessions arriving while a sync is in
+    flight wait for it instead of fetching again.
+    """
+
+    def __init__(
+        self,
+        store: SubmissionStore,
+        fetch: Callable[[], List[Dict]] = fetch_tally_responses,
+        max_age: float = SUBMISSION_TTL,
+    ):
+        self.store = store
+        self.fetch = fetch
+        self.max_age = max_age
+        self.synced_at = 0.0
+        self._lock = threading.Lock()
+
+    def sync(self) -> int:
+        """Fetch submissions from Tally into the local store"""
+        with self._lock:
+            return self._sync()
+
+    def _sync(self) -> int:
+        submissions = self.fetch()
+        self.store.upsert(submissions)
+        self.synced_at = time.time()
+        return len(submissions)
+
+    def get(self, max_age: Optional[float] = None) -> List[Dict]:
+        """All known submissions, re-syncing when the local copy is stale"""
+        max_age = self.max_age if max_age is None else max_age
+        with self._lock:
+            if time.time() - self.synced_at > max_age:
+                self._sync()
+        return self.store.all()
+
+
+def get_submission_sync(form_id: Optional[str] = None) -> SubmissionSync:
+    """Submission store and sync state shared by every session in the process"""
+    return _submission_sync(form_id or default_form_id())
+
+
+@lru_cache(maxsize=None)
+def _submission_sync(form_id: str) -> SubmissionSync:
+    return SubmissionSync(
+        SubmissionStore(form_id=form_id), fetch=partial(fetch_tally_responses, form_id)
+    )
+
+
+def sync_submissions(form_id: Optional[str] = None) -> int:
+    return get_submission_sync(form_id).sync()
+
+
+def get_submissions(
+    max_age: Optional[float] = None, form_id: Optional[str] = None
+) -> List[Dict]:
+    return get_submission_sync(form_id).get(max_age)
+
+
+def for_each_form(task: Callable[[str], object]) -> Dict[str, object]:
+    """Run task(form_id) for every cohort's form concurrently
+
+    Returns {form_id: result}; a task that raises is reported and its
+    result is the exception, so one failing form does not stop the others.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    form_ids = list(dict.fromkeys(get_cohorts().values()))
+    results = {}
+    with ThreadPoolExecutor(max_workers=len(form_ids)) as pool:
+        futures = {form_id: pool.submit(task, form_id) for form_id in form_ids}
+        for form_id, future in futures.items():
+            try:
+                results[form_id] = future.result()
+            except CassetteMiss:
+                raise
+            except Exception as e:
+                notify("error", f"Form {form_id}: {e}")
+                results[form_id] = e
+    return results
+
+
+def sync_all_forms() -> int:
+    """Sync every cohort's form concurrently, returning the submissions fetched"""
+    results = for_each_form(sync_submissions)
+    return sum(r for r in results.values() if isinstance(r, int))
+
+
+def categorize_responses_by_case(
+    submissions: List[Dict], case_number: int
+) -> List[Dict]:
+    """Filter and categorize responses for a specific case"""
+    case_responses = []
+
+    # Map question IDs to their purpose
+    # These IDs come from the Tally form structure
+    QUESTION_IDS = {
+        "oAR5MN": "team_number",  # Team Number dropdown
+        "GrpqdO": "case_number",  # Hidden field with case number
+        "OAXb5M": "team_name",  # Team Name text input
+        "VZPb56": "additional_tests",  # Additional tests textarea
+        "PA9b5x": "management",  # Management textarea
+    }
+
+    for submission in submissions:
+        # Each submission has a responses array
+        responses = submission.get("responses", [])
+
+        # Extract data from responses by questionId
+        submission_data = {}
+
+        for response in responses:
+            question_id = response.get("questionId")
+            answer = response.get("answer")
+
+            # Map questionId to field name
+            if question_id in QUESTION_IDS:
+                field_name = QUESTION_IDS[question_id]
+
+                # Handle different answer formats
+                if field_name == "case_number":
+                    # Hidden field: answer is {"case_number": "10"}
+                    if isinstance(answer, dict):
+                        submission_data["case_number"] = int(
+                            answer.get("case_number", 0)
+                        )
+                elif field_name == "team_number":
+                    # Dropdown: answer is ["1"]
+                    if isinstance(answer, list) and answer:
+                        submission_data["team_number"] = answer[0]
+                else:
+                    # Text fields: answer is string
+                    submission_data[field_name] = answer
+
+        # Check if this submission is for the requested case
+        if submission_data.get("case_number") == case_number:
+            # Build response text
+            response_parts = []
+            if submission_data.get("additional_tests"):
+                response_parts.append(
+                    f"**Additional Tests/Labs/Referrals:**\n{submission_data['additional_tests']}"
+                )
+            if submission_data.get("management"):
+                response_parts.append(
+                    f"**Management:**\n{submission_data['management']}"
+                )
+
+            response_text = (
+                "\n\n".join(response_parts)
+                if response_parts
+                else "No response provided"
+            )
+
+            # Determine team identifier - show both number and name
+            team_name = submission_data.get("team_name", "")
+            team_number = submission_data.get("team_number", "")
+
+            if team_number and team_name:
+                team_identifier = f"Team {team_number} - {team_name}"
+            elif team_number:
+                team_identifier = f"Team {team_number}"
+            elif team_name:
+                team_identifier = team_name
+            else:
+                team_identifier = "Unknown Team"
+
+            case_responses.append(
+                {
+                    "team": team_identifier,
+                    "response": response_text,
+                    "submitted_at": submission.get("submittedAt", ""),
+                    "raw_data": submission_data,
+                }
+            )
+
+    return case_responses
+
+
+def deduplicate_responses(case_responses: List[Dict]) -> List[Dict]:
+    """Keep only the latest submission per (team number, case number)
+
+    Teams often resubmit the same case; earlier submissions are superseded
+    so they are neither evaluated nor counted toward leaderboard totals.
+    """
+    latest = {}
+    for response_data in case_responses:
+        raw_data = response_data.get("raw_data", {})
+        key = (
+            raw_data.get("team_number") or response_data["team"],
+            raw_data.get("case_number"),
+        )
+        # submittedAt is an ISO-8601 timestamp, so string order is time order
+        current = latest.get(key)
+        if current is None or response_data.get("submitted_at", "") >= current.get(
+            "submitted_at", ""
+        ):
+            latest[key] = response_data
+
+    return list(latest.values())
@@ -0,0 +1,361 @@
+import bisect
+import math
+import threading
+from functools import lru_cache
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Sequence, Tuple
+
+from residentcase.config import get_setting
+
+if TYPE_CHECKING:
+    from http.server import ThreadingHTTPServer
+
+# Process-wide counters, gauges and histograms in the Prometheus text
+# exposition format, so a scraper can watch the grading and ingest pipeline
+# without opening the UI. Kept dependency-free: the metric types below cover
+# what the pipeline records, and the endpoint is a stdlib HTTP server bound to
+# localhost on a daemon thread. http.server (with http.client and email) is
+# imported only when the endpoint starts, since every core module imports this
+# one for its metrics.
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+DEFAULT_METRICS_HOST = "127.0.0.1"
+
+# Seconds; Tally and Groq calls range from ~100 ms to the 30 s timeout
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0)
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def expose(self) -> str:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.kind}",
+        ]
+        return "\n".join(lines + self.samples())
+
+
+class Counter(_Metric):
+    """Monotonically increasing count, optionally split by labels"""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+        if not self.labelnames:
+            # Exposed as 0 before the first inc(), as prometheus_client does
+            self._values[()] = 0.0
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(v)}"
+            for key, v in values
+        ]
+
+
+class Gauge(_Metric):
+    """Value that goes up and down, or is read from a callback at scrape time"""
+
+    kind = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        function: Optional[Callable[[], float]] = None,
+    ):
+        super().__init__(name, documentation)
+        self.function = function
+        self._value = 0.0
+
+    def set(self, value: float):
+        self._value = value
+
+    def set_function(self, function: Callable[[], float]):
+        """Read the value from `function` at scrape time instead"""
+        self.function = function
+
+    def inc(self, amount: float = 1.0):
+        with self._lock:
+            self._value += amount
+
+    def dec(self, amount: float = 1.0):
+        self.inc(-amount)
+
+    def value(self) -> float:
+        return self.function() if self.function else self._value
+
+    def samples(self) -> List[str]:
+        return [f"{self.name} {_format_value(self.value())}"]
+
+
+class Histogram(_Metric):
+    """Observations counted into cumulative buckets, with their sum and count"""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [count per bucket (+Inf last), sum]
+        self._values: Dict[LabelValues, Tuple[List[int], List[float]]] = {}
+        if not self.labelnames:
+            self._values[()] = ([0] * (len(self.buckets) + 1), [0.0])
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total = self._values.setdefault(
+                key, ([0] * (len(self.buckets) + 1), [0.0])
+            )
+            counts[index] += 1
+            total[0] += value
+
+    def count(self, **labels) -> int:
+        entry = self._values.get(self._key(labels))
+        return sum(entry[0]) if entry else 0
+
+    def samples(self) -> List[str]:
+        lines = []
+        with self._lock:
+            values = sorted(
+                (key, (list(counts), total[0]))
+                for key, (counts, total) in self._values.items()
+            )
+        for key, (counts, total) in values:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                le = 'le="' + _format_value(bound) + '"'
+                labels = _format_labels(self.labelnames, key, le)
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class Registry:
+    """Metrics exposed together on one endpoint"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def expose(self) -> str:
+        return "\n".join(m.expose() for m in self._metrics.values()) + "\n"
+
+
+REGISTRY = Registry()
+
+# Tally ingest
+TALLY_FETCH_SECONDS = REGISTRY.register(
+    Histogram(
+        "residentcase_tally_fetch_seconds",
+        "Latency of Tally submission requests",
+        ["form"],
+    )
+)
+TALLY_FETCH_FAILURES = REGISTRY.register(
+    Counter(
+        "residentcase_tally_fetch_failures_total",
+        "Tally submission requests that failed",
+        ["form", "reason"],
+    )
+)
+SUBMISSIONS_INGESTED = REGISTRY.register(
+    Counter(
+        "residentcase_submissions_ingested_total",
+        "Submissions received from Tally",
+        ["form"],
+    )
+)
+
+# Groq grading calls (one observation per HTTP attempt)
+GROQ_REQUEST_SECONDS = REGISTRY.register(
+    Histogram(
+        "residentcase_groq_request_seconds",
+        "Latency of Groq chat completion requests",
+        ["status"],
+    )
+)
+GROQ_RATE_LIMITED = REGISTRY.register(
+    Counter("residentcase_groq_rate_limited_total", "Groq responses with status 429")
+)
+GROQ_RETRIES = REGISTRY.register(
+    Counter("residentcase_groq_retries_total", "Groq requests retried after backoff")
+)
+GROQ_TOKENS = REGISTRY.register(
+    Counter(
+        "residentcase_groq_tokens_total",
+        "Tokens reported by Groq usage",
+        ["kind"],
+    )
+)
+
+# Evaluations and the evaluation cache
+EVALUATIONS = REGISTRY.register(
+    Counter(
+        "residentcase_evaluations_total",
+        "Grading attempts by outcome (completed, failed, pending)",
+        ["outcome"],
+    )
+)
+ZERO_SCORED = REGISTRY.register(
+    Counter(
+        "residentcase_evaluations_zero_scored_total",
+        "Completed evaluations that scored 0 (often an unparsed reply)",
+    )
+)
+CACHE_LOOKUPS = REGISTRY.register(
+    Counter(
+        "residentcase_evaluation_cache_lookups_total",
+        "Evaluation requests served from stored evaluations (hit) or graded (miss)",
+        ["result"],
+    )
+)
+
+
+def cache_hit_ratio() -> float:
+    hits = CACHE_LOOKUPS.value(result="hit")
+    total = hits + CACHE_LOOKUPS.value(result="miss")
+    return hits / total if total else 0.0
+
+
+CACHE_HIT_RATIO = REGISTRY.register(
+    Gauge(
+        "residentcase_evaluation_cache_hit_ratio",
+        "Share of stored evaluation lookups that were hits",
+        cache_hit_ratio,
+    )
+)
+# Per-session evaluation caches, summed over every session in the process
+SESSION_CACHE_HITS = REGISTRY.register(
+    Counter("residentcase_session_cache_hits_total", "Session evaluation cache hits")
+)
+SESSION_CACHE_MISSES = REGISTRY.register(
+    Counter(
+        "residentcase_session_cache_misses_total", "Session evaluation cache misses"
+    )
+)
+SESSION_CACHE_EVICTIONS = REGISTRY.register(
+    Counter(
+        "residentcase_session_cache_evictions_total",
+        "Evaluations evicted from session caches to stay within their byte budget",
+    )
+)
+GRADING_IN_FLIGHT = REGISTRY.register(
+    Gauge("residentcase_grading_in_flight", "Grading calls currently running")
+)
+# Set by the grading module, which tracks the running batches
+GRADING_QUEUE_DEPTH = REGISTRY.register(
+    Gauge(
+        "residentcase_grading_queue_depth",
+        "Responses waiting in grading batches plus grading calls in flight",
+    )
+)
+
+
+def _metrics_handler():
+    from http.server import BaseHTTPRequestHandler
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] not in ("/metrics", "/"):
+                self.send_error(404)
+                return
+            body = REGISTRY.expose().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            # Scrapes every few seconds would flood the server log
+            pass
+
+    return MetricsHandler
+
+
+def serve_metrics(port: int, host: str = DEFAULT_METRICS_HOST) -> "ThreadingHTTPServer":
+    """Serve /metrics on a daemon thread; port 0 picks a free port"""
+    from http.server import ThreadingHTTPServer
+
+    server = ThreadingHTTPServer((host, port), _metrics_handler())
+    server.daemon_threads = True
+    threading.Thread(
+        target=server.serve_forever, name="residentcase-metrics", daemon=True
+    ).start()
+    return server
+
+
+@lru_cache(maxsize=None)
+def start_metrics_server() -> Optional["ThreadingHTTPServer"]:
+    """Start the endpoint once per process when METRICS_PORT is set"""
+    port = get_setting("METRICS_PORT")
+    if not port:
+        return None
+    try:
+        return serve_metrics(
+            int(port), get_setting("METRICS_HOST", DEFAULT_METRICS_HOST)
+        )
+    except OSError:
+        # Another server process on this host already holds the port
+        return None
@@ -0,0 +1,21 @@
+import logging
+from typing import Callable, Optional
+
+logger = logging.getLogger("residentcase")
+
+# The core modules never import Streamlit; the UI installs a notifier that
+# turns these messages into st.info / st.warning / st.error calls.
+_notifier: Optional[Callable[[str, str], None]] = None
+
+
+def set_notifier(notifier: Optional[Callable[[str, str], None]]):
+    """Install a callback receiving (level, message) for user-facing messages"""
+    global _notifier
+    _notifier = notifier
+
+
+def notify(level: str, message: str):
+    """Log a message and forward it to the installed notifier, if any"""
+    logger.log(logging.getLevelName(level.upper()), message)
+    if _notifier is not None:
+        _notifier(level, message)
@@ -0,0 +1,104 @@
+import threading
+import time
+from collections import deque
+from typing import Callable, Optional
+
+# Circuit breaker states
+CLOSED = "closed"
+OPEN = "open"
+
+
+class CircuitBreaker:
+    """Stops calling a failing backend until a background probe succeeds
+
+    The breaker tracks the outcome of the last `window` calls. Once at least
+    `min_calls` of them are known and the failure rate reaches `threshold`,
+    it opens: allow() returns False so callers fail fast instead of waiting
+    on timeouts and backoff. While open, a daemon thread calls `probe` every
+    `cooldown` seconds and closes the breaker when it returns True.
+    """
+
+    def __init__(
+        self,
+        probe: Callable[[], bool],
+        window: int = 10,
+        min_calls: int = 4,
+        threshold: float = 0.5,
+        cooldown: float = 30.0,
+    ):
+        self.probe = probe
+        self.min_calls = min_calls
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.state = CLOSED
+        self.opened_at: Optional[float] = None
+        self._outcomes = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        return self.state == CLOSED
+
+    def record(self, success: bool):
+        with self._lock:
+            if self.state == OPEN:
+                return
+            self._outcomes.append(success)
+            failures = self._outcomes.count(False)
+            if (
+                len(self._outcomes) >= self.min_calls
+                and failures / len(self._outcomes) >= self.threshold
+            ):
+                self._open()
+
+    def _open(self):
+        self.state = OPEN
+        self.opened_at = time.time()
+        threading.Thread(
+            target=self._probe_until_closed, name="residentcase-probe", daemon=True
+        ).start()
+
+    def _probe_until_closed(self):
+        while True:
+            time.sleep(self.cooldown)
+            try:
+                recovered = self.probe()
+            except Exception:
+                recovered = False
+            if recovered:
+                with self._lock:
+                    self._outcomes.clear()
+                    self.state = CLOSED
+                    self.opened_at = None
+                return
+
+    @property
+    def failure_rate(self) -> float:
+        if not self._outcomes:
+            return 0.0
+        return self._outcomes.count(False) / len(self._outcomes)
+
+
+class DeadlineBudget:
+    """One overall deadline shared by a batch of calls
+
+    Each call may still use its full per-request timeout, cut short only by
+    the time left in the batch; once the deadline passes no new call starts,
+    so the batch as a whole ends on time.
+    """
+
+    def __init__(self, seconds: float, calls: int):
+        self.expires = time.monotonic() + seconds
+        self.calls_left = calls
+
+    @property
+    def remaining(self) -> float:
+        return max(0.0, self.expires - time.monotonic())
+
+    @property
+    def exhausted(self) -> bool:
+        return self.remaining <= 0
+
+    def next_deadline(self) -> float:
+        """Monotonic time by which the next call must finish"""
+        self.calls_left = max(0, self.calls_left - 1)
+        return self.expires
@@ -0,0 +1,189 @@
+import re
+from functools import lru_cache
+from typing import TYPE_CHECKING, Dict, List, Sequence, Tuple
+
+# NumPy is imported inside the functions that need it, so importing this
+# module (e.g. from the UI) does not pay for it until the first score
+if TYPE_CHECKING:
+    import numpy as np
+
+# Coverage of a reference point's weighted terms needed for a HIT / PARTIAL,
+# mirroring the checklist rubric the LLM grader is asked to follow
+HIT_THRESHOLD = 0.5
+PARTIAL_THRESHOLD = 0.2
+# Bolded key terms in cases.md count more than the rest of the bullet
+KEY_TERM_WEIGHT = 2.0
+
+STOPWORDS = frozenset(
+    """
+    a an and are as at be based by can consider for from has have if in into is
+    it its may more most of on or per should than that the their then these this
+    to use used using via was were when which while with within without e g eg
+    patient patients including include other each such both also due ie
+    """.split()
+)
+
+_CITATION_RE = re.compile(r"\\?\[\d+\\?\]")
+_BOLD_RE = re.compile(r"\*\*(.+?)\*\*")
+_TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9\-]*")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase content words with a light plural strip"""
+    tokens = []
+    for token in _TOKEN_RE.findall(text.lower()):
+        token = token.strip("-")
+        if len(token) < 2 or token in STOPWORDS:
+            continue
+        if len(token) > 4 and token.endswith("s") and not token.endswith("ss"):
+            token = token[:-1]
+        tokens.append(token)
+    return tokens
+
+
+@lru_cache(maxsize=64)
+def reference_points(
+    management: str,
+) -> Tuple[Tuple[str, Tuple[str, ...], Tuple[str, ...]], ...]:
+    """Split the management section into (text, key terms, other terms) per bullet"""
+    points = []
+    for line in management.splitlines():
+        line = _CITATION_RE.sub("", line).strip()
+        # Bullets and bold sub-headings ("**Basal insulin titration:**") are points
+        if not line.startswith(("-", "*")):
+            continue
+        text = line.lstrip("-* ").strip()
+        if not text:
+            continue
+        key_terms = tuple(
+            dict.fromkeys(
+                t for phrase in _BOLD_RE.findall(line) for t in tokenize(phrase)
+            )
+        )
+        other_terms = tuple(
+            t for t in dict.fromkeys(tokenize(text)) if t not in key_terms
+        )
+        if key_terms or other_terms:
+            points.append((text.replace("**", ""), key_terms, other_terms))
+    return tuple(points)
+
+
+@lru_cache(maxsize=64)
+def _reference_matrix(management: str):
+    """Vocabulary index and IDF-weighted (points x vocabulary) reference matrix"""
+    import numpy as np
+
+    points = reference_points(management)
+    vocabulary = {}
+    for _, key_terms, other_terms in points:
+        for term in key_terms + other_terms:
+            vocabulary.setdefault(term, len(vocabulary))
+
+    weights = np.zeros((len(points), len(vocabulary)))
+    key_mask = np.zeros_like(weights, dtype=bool)
+    for row, (_, key_terms, other_terms) in enumerate(points):
+        weights[row, [vocabulary[t] for t in other_terms]] = 1.0
+        weights[row, [vocabulary[t] for t in key_terms]] = KEY_TERM_WEIGHT
+        key_mask[row, [vocabulary[t] for t in key_terms]] = True
+
+    # Terms shared by many reference points say little about which one was hit
+    document_freq = np.count_nonzero(weights, axis=0)
+    idf = np.log((1 + len(points)) / (1 + document_freq)) + 1.0
+    weights *= idf
+    return vocabulary, weights, np.where(key_mask, weights, 0.0)
+
+
+def coverage_matrix(management: str, responses: Sequence[str]) -> "np.ndarray":
+    """Fraction of each reference point's weighted terms found in each response
+
+    Returns a (responses x reference points) array in [0, 1].
+    """
+    import numpy as np
+
+    vocabulary, weights, key_weights = _reference_matrix(management)
+    if not len(vocabulary) or not responses:
+        return np.zeros((len(responses), weights.shape[0]))
+
+    present = np.zeros((len(responses), len(vocabulary)))
+    for row, response in enumerate(responses):
+        columns = {vocabulary[t] for t in tokenize(response) if t in vocabulary}
+        present[row, list(columns)] = 1.0
+
+    coverage = (present @ weights.T) / weights.sum(axis=1)
+    # Naming the bolded key terms of a point is enough on its own
+    key_totals = key_weights.sum(axis=1)
+    has_key_terms = key_totals > 0
+    key_coverage = (present @ key_weights.T)[:, has_key_terms] / key_totals[
+        has_key_terms
+    ]
+    coverage[:, has_key_terms] = np.maximum(coverage[:, has_key_terms], key_coverage)
+    return coverage
+
+
+def provisional_scores(management: str, responses: Sequence[str]) -> "np.ndarray":
+    """Offline keyword-coverage score (0-100) for every response to a case at once"""
+    return _scores_from_coverage(coverage_matrix(management, responses))
+
+
+def _scores_from_coverage(coverage: "np.ndarray") -> "np.ndarray":
+    """HIT = full credit, PARTIAL = half credit, averaged over reference points"""
+    import numpy as np
+
+    if coverage.shape[1] == 0:
+        return np.zeros(coverage.shape[0], dtype=int)
+    credit = np.where(
+        coverage >= HIT_THRESHOLD,
+        1.0,
+        np.where(coverage >= PARTIAL_THRESHOLD, 0.5, 0.0),
+    )
+    return np.rint(credit.mean(axis=1) * 100).astype(int)
+
+
+def provisional_evaluation(management: str, team_response: str) -> Dict:
+    """Evaluation dict built from the provisional scorer, used when the LLM is unavailable"""
+    coverage_row = coverage_matrix(management, [team_response])
+    coverage = coverage_row[0]
+    points = reference_points(management)
+    hits = [p[0] for p, c in zip(points, coverage) if c >= HIT_THRESHOLD]
+    partials = [
+        p[0] for p, c in zip(points, coverage) if PARTIAL_THRESHOLD <= c < HIT_THRESHOLD
+    ]
+    missed = [p[0] for p, c in zip(points, coverage) if c < PARTIAL_THRESHOLD]
+    score = int(_scores_from_coverage(coverage_row)[0])
+
+    return {
+        "score": score,
+        "checklist": "\n".join(
+            [f"- {p} — HIT" for p in hits]
+            + [f"- {p} — PARTIAL" for p in partials]
+            + [f"- {p} — MISSED" for p in missed]
+        ),
+        "tally": f"{len(hits)} HITs, {len(partials)} PARTIALs, {len(missed)} MISSEDs out of {len(points)} points",
+        "strengths": "\n".join(f"- {p}" for p in hits) or "- None detected",
+        "improvements": "Provisional keyword-coverage score; AI evaluation unavailable.",
+        "missed_points": "\n".join(f"- {p}" for p in missed),
+        "clinical_reasoning": "",
+        "full_evaluation": "",
+        "provisional": True,
+    }
+
+
+def score_agreement(provisional: Sequence[float], llm: Sequence[float]) -> Dict:
+    """Compare provisional scores with LLM scores for the same responses"""
+    import numpy as np
+
+    provisional = np.asarray(provisional, dtype=float)
+    llm = np.asarray(llm, dtype=float)
+    n = len(llm)
+    if n == 0:
+        return {"n": 0, "mae": None, "correlation": None}
+
+    correlation = None
+    if n >= 2 and provisional.std() > 0 and llm.std() > 0:
+        correlation = float(np.corrcoef(provisional, llm)[0, 1])
+
+    return {
+        "n": n,
+        "mae": float(np.abs(provisional - llm).mean()),
+        "correlation": correlation,
+    }
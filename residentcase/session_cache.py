@@ -0,0 +1,115 @@
+import json
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+from residentcase.config import get_setting
+from residentcase.metrics import (
+    SESSION_CACHE_EVICTIONS,
+    SESSION_CACHE_HITS,
+    SESSION_CACHE_MISSES,
+)
+
+# Default per-session budget: a pending evaluation serializes to roughly
+# 1-3 KB, so this holds several hundred before the least recent are dropped
+DEFAULT_SESSION_CACHE_BYTES = 2_000_000
+
+
+def entry_size(value: Any) -> int:
+    """Approximate memory held by a cached value: its JSON-encoded length"""
+    return len(json.dumps(value, default=str))
+
+
+class ByteBudgetCache:
+    """Least-recently-used mapping whose entries' sizes sum to at most max_bytes
+
+    Each entry's size is taken once, when it is put: either the size the
+    caller already knows (e.g. the length of the JSON it just wrote) or its
+    entry_size(). Entries larger than the whole budget are not kept.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            self._counted("miss")
+            return default
+        self._entries.move_to_end(key)
+        self.hits += 1
+        self._counted("hit")
+        return entry[0]
+
+    def put(self, key: Hashable, value: Any, size: Optional[int] = None):
+        self.pop(key)
+        if size is None:
+            size = entry_size(value)
+        if size > self.max_bytes:
+            return
+        self._entries[key] = (value, size)
+        self.bytes += size
+        while self.bytes > self.max_bytes:
+            _, (_, evicted_size) = self._entries.popitem(last=False)
+            self.bytes -= evicted_size
+            self.evictions += 1
+            self._counted("eviction")
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return default
+        self.bytes -= entry[1]
+        return entry[0]
+
+    def clear(self):
+        self._entries.clear()
+        self.bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "entries": len(self._entries),
+            "bytes": self.bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+    def _counted(self, event: str):
+        """Hook for subclasses that also report hits, misses and evictions"""
+
+
+class EvaluationCache(ByteBudgetCache):
+    """One session's evaluations that are not in the shared store, capped in bytes
+
+    Graded evaluations are read from the evaluation store (which keeps its
+    own bounded copy in memory), so a session only holds what exists nowhere
+    else: pending grades with their provisional scores, and small flags.
+    An evicted pending grade is shown as pending with a fresh provisional score.
+    """
+
+    def __init__(self, max_bytes: Optional[int] = None):
+        if max_bytes is None:
+            max_bytes = int(
+                get_setting("SESSION_CACHE_BYTES", DEFAULT_SESSION_CACHE_BYTES)
+            )
+        super().__init__(max_bytes)
+
+    def _counted(self, event: str):
+        {
+            "hit": SESSION_CACHE_HITS,
+            "miss": SESSION_CACHE_MISSES,
+            "eviction": SESSION_CACHE_EVICTIONS,
+        }[event].inc()
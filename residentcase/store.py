@@ -0,0 +1,282 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from functools import lru_cache
+from typing import Dict, List, Optional, Set, Tuple
+
+from residentcase.config import BASE_DIR, default_form_id, get_setting
+from residentcase.session_cache import ByteBudgetCache
+
+DEFAULT_EVAL_STORE_PATH = os.path.join(BASE_DIR, ".residentcase", "evaluations.sqlite3")
+DEFAULT_SUBMISSION_STORE_PATH = os.path.join(
+    BASE_DIR, ".residentcase", "submissions.sqlite3"
+)
+# Stored evaluations each form's store keeps in memory (bytes of JSON); a
+# graded evaluation is roughly 2-6 KB, so this holds several thousand
+DEFAULT_EVAL_MEMORY_BYTES = 32_000_000
+
+
+def form_store_path(path: str, form_id: Optional[str]) -> str:
+    """Store file for one form: the configured path suffixed with the form id"""
+    root, ext = os.path.splitext(path)
+    return f"{root}-{form_id or default_form_id()}{ext}"
+
+
+def recorded_form_id(path: str) -> Optional[str]:
+    """Form id recorded in a store file's Tally submissions, if any"""
+    if not os.path.exists(path):
+        return None
+    conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    try:
+        row = conn.execute("SELECT payload FROM submissions LIMIT 1").fetchone()
+    except sqlite3.DatabaseError:
+        return None
+    finally:
+        conn.close()
+    return json.loads(row[0]).get("formId") if row else None
+
+
+@lru_cache(maxsize=None)
+def migrate_legacy_stores(eval_path: str, submission_path: str):
+    """Rename the unsuffixed stores of single-form deployments, once
+
+    Before cohorts, the stores were not suffixed with a form id. They are
+    renamed to the suffixed names of the form their submissions were fetched
+    from (TALLY_FORM_ID if none are stored), unless that form already has
+    its own stores.
+    """
+    owner = recorded_form_id(submission_path) or default_form_id()
+    for legacy in (eval_path, submission_path):
+        target = form_store_path(legacy, owner)
+        if os.path.exists(legacy) and not os.path.exists(target):
+            os.replace(legacy, target)
+
+
+def default_store_path(setting: str, default: str, form_id: Optional[str]) -> str:
+    """Path of one form's store under the configured store location"""
+    migrate_legacy_stores(
+        get_setting("EVAL_STORE_PATH", DEFAULT_EVAL_STORE_PATH),
+        get_setting("SUBMISSION_STORE_PATH", DEFAULT_SUBMISSION_STORE_PATH),
+    )
+    return form_store_path(get_setting(setting, default), form_id)
+
+
+def normalize_response(text: str) -> str:
+    """Normalize response text so trivially different resubmissions compare equal"""
+    text = unicodedata.normalize("NFC", text or "")
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def response_hash(text: str) -> str:
+    """Stable hash of the normalized response text"""
+    return hashlib.sha256(normalize_response(text).encode("utf-8")).hexdigest()
+
+
+class _SqliteStore:
+    """Single SQLite connection shared by every session in the process
+
+    Access is serialized with a lock, since Streamlit runs each session
+    (and the warm-up) in its own thread.
+    """
+
+    SCHEMA = ""
+
+    def __init__(self, path: str):
+        self.path = path
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        with self._conn:
+            self._conn.executescript(self.SCHEMA)
+
+
+class EvaluationStore(_SqliteStore):
+    """Persistent evaluations keyed by (case number, response hash)
+
+    The most recently used rows are also kept in memory once read (or bulk
+    loaded with preload), up to EVAL_MEMORY_BYTES of their stored JSON, so
+    repeated leaderboard lookups do not touch the database.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS evaluations (
+            case_number INTEGER NOT NULL,
+            response_hash TEXT NOT NULL,
+            evaluation TEXT NOT NULL,
+            created_at REAL NOT NULL,
+            PRIMARY KEY (case_number, response_hash)
+        )
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        form_id: Optional[str] = None,
+        memory_bytes: Optional[int] = None,
+    ):
+        super().__init__(
+            path
+            or default_store_path("EVAL_STORE_PATH", DEFAULT_EVAL_STORE_PATH, form_id)
+        )
+        if memory_bytes is None:
+            memory_bytes = int(
+                get_setting("EVAL_MEMORY_BYTES", DEFAULT_EVAL_MEMORY_BYTES)
+            )
+        self._memory = ByteBudgetCache(memory_bytes)
+
+    def preload(self) -> int:
+        """Load the newest evaluations that fit in memory, returning the count"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT case_number, response_hash, evaluation FROM evaluations "
+                "ORDER BY created_at DESC"
+            )
+            loaded, budget = [], self._memory.max_bytes
+            for case_number, digest, evaluation in rows:
+                budget -= len(evaluation)
+                if budget < 0:
+                    break
+                loaded.append((case_number, digest, evaluation))
+            # Oldest first, so the newest end up most recently used
+            for case_number, digest, evaluation in reversed(loaded):
+                self._memory.put(
+                    (case_number, digest), json.loads(evaluation), len(evaluation)
+                )
+        return len(loaded)
+
+    def get(self, case_number: int, digest: str) -> Optional[Dict]:
+        with self._lock:
+            evaluation = self._memory.get((case_number, digest))
+            if evaluation is not None:
+                return evaluation
+            row = self._conn.execute(
+                "SELECT evaluation FROM evaluations WHERE case_number = ? AND response_hash = ?",
+                (case_number, digest),
+            ).fetchone()
+            if row is None:
+                return None
+            evaluation = json.loads(row[0])
+            self._memory.put((case_number, digest), evaluation, len(row[0]))
+            return evaluation
+
+    def put(self, case_number: int, digest: str, evaluation: Dict):
+        text = json.dumps(evaluation)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO evaluations VALUES (?, ?, ?, ?)",
+                (case_number, digest, text, time.time()),
+            )
+            self._memory.put((case_number, digest), evaluation, len(text))
+
+    def delete(self, case_number: int, digest: str):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "DELETE FROM evaluations WHERE case_number = ? AND response_hash = ?",
+                (case_number, digest),
+            )
+            self._memory.pop((case_number, digest))
+
+
+class SubmissionStore(_SqliteStore):
+    """Local copy of raw Tally submissions keyed by submission id
+
+    Also records which pages of a backfill have been written, so an
+    interrupted backfill resumes where it stopped.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS submissions (
+            id TEXT PRIMARY KEY,
+            submitted_at TEXT NOT NULL,
+            payload TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS backfill_runs (
+            run TEXT PRIMARY KEY,
+            total INTEGER NOT NULL,
+            started_at REAL NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS backfill_pages (
+            run TEXT NOT NULL,
+            page INTEGER NOT NULL,
+            PRIMARY KEY (run, page)
+        );
+    """
+
+    def __init__(self, path: Optional[str] = None, form_id: Optional[str] = None):
+        super().__init__(
+            path
+            or default_store_path(
+                "SUBMISSION_STORE_PATH", DEFAULT_SUBMISSION_STORE_PATH, form_id
+            )
+        )
+
+    @staticmethod
+    def _row(submission: Dict) -> Tuple[str, str, str]:
+        submission_id = (
+            submission.get("id")
+            or hashlib.sha256(
+                json.dumps(submission, sort_keys=True).encode("utf-8")
+            ).hexdigest()
+        )
+        return submission_id, submission.get("submittedAt", ""), json.dumps(submission)
+
+    def upsert(self, submissions: List[Dict]) -> int:
+        """Insert or update submissions, returning how many were written"""
+        rows = [self._row(submission) for submission in submissions]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO submissions VALUES (?, ?, ?)", rows
+            )
+        return len(rows)
+
+    def all(self) -> List[Dict]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT payload FROM submissions ORDER BY submitted_at"
+            ).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM submissions").fetchone()[0]
+
+    def backfill_state(self, run: str) -> Tuple[Optional[int], Set[int]]:
+        """Submission total recorded for a backfill run and its completed pages"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT total FROM backfill_runs WHERE run = ?", (run,)
+            ).fetchone()
+            pages = self._conn.execute(
+                "SELECT page FROM backfill_pages WHERE run = ?", (run,)
+            ).fetchall()
+        return (row[0] if row else None), {page for (page,) in pages}
+
+    def start_backfill(self, run: str, total: int, keep_pages: Set[int]):
+        """Record the current total and forget completed pages not in keep_pages"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO backfill_runs VALUES (?, ?, ?)",
+                (run, total, time.time()),
+            )
+            self._conn.execute("DELETE FROM backfill_pages WHERE run = ?", (run,))
+            self._conn.executemany(
+                "INSERT INTO backfill_pages VALUES (?, ?)",
+                [(run, page) for page in keep_pages],
+            )
+
+    def write_page(self, run: str, page: int, submissions: List[Dict]):
+        """Store one backfilled page and mark it done in the same transaction"""
+        rows = [self._row(submission) for submission in submissions]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO submissions VALUES (?, ?, ?)", rows
+            )
+            self._conn.execute(
+                "INSERT OR IGNORE INTO backfill_pages VALUES (?, ?)", (run, page)
+            )
@@ -0,0 +1,1058 @@
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+from typing import Dict, List, Optional
+
+from residentcase.analytics import HISTOGRAM_BINS, RANK_INTERVAL, cohort_analytics
+from residentcase.catalog import load_cases
+from residentcase.config import apply_overrides, get_cohorts
+from residentcase.grading import (
+    batch_budget,
+    changed_inputs,
+    evaluate_response,
+    get_evaluation_store,
+    get_grading_breaker,
+)
+from residentcase.ingest import (
+    categorize_responses_by_case,
+    deduplicate_responses,
+    get_submissions,
+    sync_all_forms,
+)
+from residentcase.metrics import start_metrics_server
+from residentcase.notify import set_notifier
+from residentcase.resilience import OPEN
+from residentcase.scoring import (
+    provisional_evaluation,
+    provisional_scores,
+    score_agreement,
+)
+from residentcase.session_cache import EvaluationCache
+from residentcase.store import response_hash
+from residentcase.warmup import RUNNING, Warmup, start_warmup
+
+
+def configure_page():
+    """Page config, styling, and settings; runs at the top of every script run"""
+    st.set_page_config(
+        page_title="Resident CASE - Diabetes Management",
+        page_icon="🏥",
+        layout="wide",
+        initial_sidebar_state="expanded",
+    )
+
+    # Configure API Keys from Streamlit secrets
+    # For local development: .streamlit/secrets.toml
+    # For Streamlit Cloud: Add secrets in dashboard Settings > Secrets
+    try:
+        apply_overrides(st.secrets.to_dict())
+    except Exception:
+        # Fallback to environment variables if secrets not available
+        st.warning(
+            "⚠️ Secrets not configured. Using environment variables or demo mode."
+        )
+
+    # Core modules report problems through notify(); show them in the page
+    set_notifier(page_notifier)
+
+    # Add custom CSS for better formatting
+    st.markdown(
+        """
+    <style>
+        .stTabs [data-baseweb="tab-list"] {
+            gap: 24px;
+        }
+        .stTabs [data-baseweb="tab"] {
+            height: 50px;
+            white-space: pre-wrap;
+            background-color: #f0f2f6;
+            border-radius: 4px 4px 0 0;
+            padding: 10px 24px;
+            font-weight: 500;
+        }
+        .stTabs [aria-selected="true"] {
+            background-color: #ff4b4b;
+            color: white;
+        }
+        .team-response {
+            background-color: #f8f9fa;
+            padding: 20px;
+            border-radius: 8px;
+            margin-bottom: 20px;
+            border-left: 4px solid #ff4b4b;
+        }
+        .score-card {
+            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+            color: white;
+            padding: 15px;
+            border-radius: 8px;
+            margin: 10px 0;
+        }
+    </style>
+    """,
+        unsafe_allow_html=True,
+    )
+
+
+def page_notifier(level: str, message: str):
+    """Show a notify() message in the page of the script run that sent it
+
+    Background threads such as the warm-up have no script run to show it
+    in; notify() has already logged their messages.
+    """
+    if get_script_run_ctx(suppress_warning=True) is not None:
+        getattr(st, level)(message)
+
+
+def display_warmup_status(warmup: Warmup):
+    """Readiness indicator for the shared caches"""
+    if warmup.is_ready:
+        st.sidebar.success(f"🟢 Ready (warmed up in {warmup.elapsed:.1f}s)")
+        return
+
+    if warmup.is_finished:
+        st.sidebar.warning("🟠 Warm-up finished with errors")
+    else:
+        running = [n for n, status in warmup.status.items() if status == RUNNING]
+        st.sidebar.info(f"🟡 Warming up: {running[0] if running else 'starting'}...")
+
+    for name, status in warmup.status.items():
+        icon = {"ready": "✅", "failed": "❌", "running": "⏳"}.get(status, "▫️")
+        detail = warmup.details.get(name, "")
+        st.sidebar.caption(f"{icon} {name}{': ' + detail if detail else ''}")
+
+
+def display_grading_status():
+    """Warn when the grading circuit breaker has paused AI evaluation"""
+    breaker = get_grading_breaker()
+    if breaker.state == OPEN:
+        st.sidebar.error(
+            "🔴 AI grading paused: Groq is failing. New evaluations are marked "
+            "pending and grading resumes automatically once it recovers."
+        )
+
+
+def session_cache() -> EvaluationCache:
+    """This session's byte-budgeted evaluation cache, created on first use"""
+    if "evaluation_cache" not in st.session_state:
+        st.session_state["evaluation_cache"] = EvaluationCache()
+    return st.session_state["evaluation_cache"]
+
+
+def session_evaluation(
+    form_id: str, case_number: int, case: Dict, response_data: Dict
+) -> Optional[Dict]:
+    """A team's evaluation from the shared store, else this session's pending copy
+
+    Graded evaluations are only held by the store. The session keeps the
+    pending grade of a response that could not be graded, until the store
+    has a grade for it against the current case text.
+    """
+    cache = session_cache()
+    key = f"{form_id}:cache_{case_number}_{response_data['team']}"
+    digest = response_hash(response_data["response"])
+    pending = cache.get(key)
+    if pending is not None and pending.get("response_hash", digest) != digest:
+        cache.pop(key)
+        pending = None
+    stored = get_evaluation_store(form_id).get(case_number, digest)
+    if stored is not None and (pending is None or not changed_inputs(stored, case)):
+        if pending is not None:
+            cache.pop(key)
+        return stored
+    return pending
+
+
+def remember_evaluation(form_id: str, case_number: int, team: str, evaluation: Dict):
+    """Keep a pending grade for this session; graded ones are in the store"""
+    key = f"{form_id}:cache_{case_number}_{team}"
+    if evaluation.get("pending"):
+        session_cache().put(key, evaluation)
+    else:
+        session_cache().pop(key)
+
+
+def display_session_cache():
+    stats = session_cache().stats()
+    st.sidebar.caption(
+        f"🧠 Session cache: {stats['entries']} item(s), "
+        f"{stats['bytes'] / 1024:.0f}/{stats['max_bytes'] / 1024:.0f} KB · "
+        f"{stats['hits']} hits, {stats['misses']} misses, "
+        f"{stats['evictions']} evictions"
+    )
+
+
+def display_team_response(team_name: str, response_data: Dict, evaluation: Dict):
+    """Display a single team's response with evaluation"""
+    st.markdown(f"### 👥 {team_name}")
+
+    # Display score card
+    score = evaluation["score"]
+    score_color = "#2ecc71" if score >= 80 else "#f39c12" if score >= 60 else "#e74c3c"
+    score_label = "Provisional Score" if evaluation.get("provisional") else "Score"
+    if evaluation.get("pending"):
+        score_label = f"⏳ Pending · {score_label}"
+
+    st.markdown(
+        f"""
+    <div class="score-card" style="background: {score_color};">
+        <h2 style="margin: 0;">{score_label}: {score}/100</h2>
+        <p style="margin: 5px 0 0 0;">{'Excellent' if score >= 80 else 'Good' if score >= 60 else 'Needs Improvement'}</p>
+    </div>
+    """,
+        unsafe_allow_html=True,
+    )
+    if evaluation.get("pending"):
+        st.caption(
+            f"AI grading did not finish ({evaluation.get('pending_reason', 'unavailable')}); "
+            "retry from the case page."
+        )
+
+    # Display response
+    with st.expander("📝 Team Response", expanded=True):
+        st.markdown(response_data["response"])
+        if response_data.get("submitted_at"):
+            st.caption(f"Submitted: {response_data['submitted_at']}")
+
+    # Display evaluation
+    col1, col2 = st.columns(2)
+
+    with col1:
+        st.markdown("#### ✅ Strengths")
+        st.markdown(evaluation["strengths"])
+
+        st.markdown("#### 🎯 Clinical Reasoning")
+        st.markdown(evaluation["clinical_reasoning"])
+
+    with col2:
+        st.markdown("#### 📈 Areas for Improvement")
+        st.markdown(evaluation["improvements"])
+
+        if evaluation["missed_points"]:
+            st.markdown("#### ⚠️ Key Points Missed")
+            st.markdown(evaluation["missed_points"])
+
+    # Show checklist breakdown
+    if evaluation.get("checklist") or evaluation.get("tally"):
+        with st.expander("🔍 Scoring Breakdown (Checklist)", expanded=False):
+            if evaluation.get("tally"):
+                st.info(f"**Tally:** {evaluation['tally']}")
+            if evaluation.get("checklist"):
+                st.markdown(evaluation["checklist"])
+
+    st.markdown("---")
+
+
+def render_cohort_analytics(analytics: Dict, cases: List[Dict]):
+    """Normalized standings and score distributions across the cohort"""
+    st.markdown("### 📐 Normalized Standings")
+    st.caption(
+        "Teams ranked by their average z-score over the cases they attempted, so "
+        "skipping a hard case neither helps nor hurts. The rank range covers "
+        f"{RANK_INTERVAL:.0%} of bootstrap resamples of the case set."
+    )
+
+    order = analytics["rank"].argsort()
+    st.dataframe(
+        {
+            "Rank": analytics["rank"][order],
+            "Team": [analytics["teams"][i] for i in order],
+            "Avg z-score": analytics["normalized"][order].round(2),
+            "Avg (attempted)": analytics["average"][order].round(1),
+            "Cases": analytics["attempted"][order],
+            "Rank range": [
+                f"#{analytics['rank_low'][i]}–#{analytics['rank_high'][i]}"
+                for i in order
+            ],
+            "Rank stability": (analytics["stability"][order] * 100).round(0),
+        },
+        hide_index=True,
+        width="stretch",
+    )
+
+    st.markdown("### 📊 Score Distribution")
+    case_labels = [f"Case {n}" for n in range(1, len(cases) + 1)]
+    selected = st.selectbox(
+        "Distribution for:", ["All cases"] + case_labels, key="histogram_case"
+    )
+    histograms = analytics["histograms"]
+    counts = (
+        histograms.sum(axis=0)
+        if selected == "All cases"
+        else histograms[case_labels.index(selected)]
+    )
+    width = 100 // HISTOGRAM_BINS
+    st.bar_chart(
+        {
+            "Score": [
+                f"{b * width}–{b * width + width - 1}" for b in range(len(counts))
+            ],
+            "Teams": counts,
+        },
+        x="Score",
+        y="Teams",
+    )
+
+
+def render_leaderboard(cases: List[Dict], form_id: str):
+    """Overall leaderboard across all cases"""
+    # Display overall leaderboard across all cases
+    st.header("🏆 Overall Team Leaderboard")
+    st.markdown("*Aggregate scores across all 10 diabetes management cases*")
+    st.success(
+        "⚡ **Fast Mode**: Using cached evaluations from individual case pages for instant display"
+    )
+    st.markdown("---")
+
+    # Fetch all responses
+    all_responses = get_submissions(form_id=form_id)
+
+    if not all_responses:
+        st.info("⚠️ No team responses found. Using demo mode.")
+        st.markdown(
+            "This page will show overall standings once teams submit responses."
+        )
+    else:
+        # Calculate total scores for each team across all cases
+        # ONLY use cached evaluations for fast display; provisional scores are
+        # kept apart and never count toward totals, ranks or the winner
+        team_scores = {}  # {team_name: {"total": score, "cases": {case_num: score}}}
+        unevaluated_responses = []  # Track responses that need evaluation
+
+        for case_idx in range(len(cases)):
+            case_number = case_idx + 1
+            case_responses = deduplicate_responses(
+                categorize_responses_by_case(all_responses, case_number)
+            )
+
+            if case_responses:
+                # Instant offline scores for every response to this case at once
+                provisional = provisional_scores(
+                    cases[case_idx]["management"],
+                    [r["response"] for r in case_responses],
+                )
+
+                for response_data, provisional_score in zip(
+                    case_responses, provisional
+                ):
+                    team_name = response_data["team"]
+
+                    # Initialize team if not exists
+                    if team_name not in team_scores:
+                        team_scores[team_name] = {
+                            "total": 0,
+                            "cases": {},
+                            "count": 0,
+                            "provisional": {},
+                        }
+
+                    # ONLY use cached or stored evaluations - don't run AI here;
+                    # grades of an edited case are queued for regrading below
+                    evaluation = session_evaluation(
+                        form_id, case_number, cases[case_idx], response_data
+                    )
+                    if (
+                        evaluation is not None
+                        and not evaluation.get("provisional")
+                        and not changed_inputs(evaluation, cases[case_idx])
+                    ):
+                        score = evaluation["score"]
+                        team_scores[team_name]["cases"][case_number] = score
+                        team_scores[team_name]["total"] += score
+                        team_scores[team_name]["count"] += 1
+                    else:
+                        # Shown separately until the AI grade is in
+                        team_scores[team_name]["provisional"][case_number] = int(
+                            provisional_score
+                        )
+                        # Track unevaluated responses
+                        unevaluated_responses.append(
+                            {
+                                "case_idx": case_idx,
+                                "case_number": case_number,
+                                "team_name": team_name,
+                                "response_data": response_data,
+                            }
+                        )
+
+        graded_teams = [t for t, data in team_scores.items() if data["count"]]
+
+        # Show info about unevaluated responses
+        if unevaluated_responses:
+            graded_responses = sum(data["count"] for data in team_scores.values())
+            st.info(
+                f"⚡ **Fast Display Mode**: {graded_responses} AI-graded response(s) from "
+                f"{len(graded_teams)} team(s) count toward the rankings. "
+                f"{len(unevaluated_responses)} response(s) not yet evaluated by AI show a "
+                f"provisional keyword-coverage score, which does not count until they are graded."
+            )
+
+            # Add button to evaluate remaining responses
+            if st.button(
+                f"🤖 Evaluate {len(unevaluated_responses)} Remaining Response(s)",
+                key="eval_remaining_leaderboard",
+                type="primary",
+            ):
+                progress_text = st.empty()
+                progress_bar = st.progress(0)
+                budget = batch_budget(len(unevaluated_responses))
+
+                for idx, item in enumerate(unevaluated_responses):
+                    progress_text.text(
+                        f"Evaluating {item['team_name']} for Case {item['case_number']}... ({idx+1}/{len(unevaluated_responses)})"
+                    )
+                    progress_bar.progress((idx + 1) / len(unevaluated_responses))
+
+                    # Evaluate and cache
+                    evaluation = evaluate_response(
+                        item["case_number"],
+                        cases[item["case_idx"]],
+                        item["response_data"]["response"],
+                        deadline=budget.next_deadline(),
+                        form_id=form_id,
+                    )
+                    remember_evaluation(
+                        form_id, item["case_number"], item["team_name"], evaluation
+                    )
+
+                progress_text.empty()
+                progress_bar.empty()
+                st.success("✅ All evaluations complete! Refreshing leaderboard...")
+                st.rerun()
+
+            st.markdown("---")
+
+        if not graded_teams:
+            st.warning(
+                "⚠️ No evaluated responses found yet. Please:\n"
+                "1. Go to individual case pages and click 'Evaluate All Teams'\n"
+                "2. OR click the button above to evaluate all pending responses"
+            )
+        else:
+            # Sort teams by total AI-graded score; teams with no graded
+            # response yet are listed last, unranked
+            sorted_teams = sorted(
+                team_scores.items(),
+                key=lambda x: (x[1]["count"] > 0, x[1]["total"]),
+                reverse=True,
+            )
+
+            # Display winner announcement
+            winner_name = sorted_teams[0][0]
+            winner_total = sorted_teams[0][1]["total"]
+            winner_count = sorted_teams[0][1]["count"]
+            winner_avg = winner_total / winner_count if winner_count > 0 else 0
+
+            st.balloons()
+            if unevaluated_responses:
+                st.caption(
+                    f"⏳ Standings can still change: {len(unevaluated_responses)} response(s) "
+                    "are awaiting AI evaluation."
+                )
+            st.markdown(
+                f"""
+            <div style="background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); 
+                        color: white; padding: 30px; border-radius: 15px; text-align: center; margin: 20px 0;">
+                <h1 style="margin: 0; font-size: 3em;">🥇 {winner_name}</h1>
+                <h2 style="margin: 10px 0 0 0;">Total Score: {winner_total:,} points</h2>
+                <p style="margin: 5px 0 0 0; font-size: 1.2em;">Average: {winner_avg:.1f}/100 across {winner_count} case(s)</p>
+            </div>
+            """,
+                unsafe_allow_html=True,
+            )
+
+            st.markdown("---")
+            st.markdown("### 📊 Complete Rankings")
+
+            # Create columns for medals
+            if len(graded_teams) >= 3:
+                col1, col2, col3 = st.columns(3)
+
+                for idx, col in enumerate([col1, col2, col3]):
+                    if idx < len(sorted_teams):
+                        team_name, data = sorted_teams[idx]
+                        medal = ["🥇", "🥈", "🥉"][idx]
+                        avg_score = (
+                            data["total"] / data["count"] if data["count"] > 0 else 0
+                        )
+
+                        with col:
+                            st.markdown(
+                                f"""
+                            <div style="background: {'#FFD700' if idx == 0 else '#C0C0C0' if idx == 1 else '#CD7F32'}30; 
+                                        padding: 20px; border-radius: 10px; text-align: center;">
+                                <h2 style="margin: 0;">{medal}</h2>
+                                <h3 style="margin: 10px 0;">{team_name}</h3>
+                                <p style="margin: 5px 0; font-size: 1.5em; font-weight: bold;">{data["total"]:,} pts</p>
+                                <p style="margin: 5px 0;">Avg: {avg_score:.1f}/100</p>
+                                <p style="margin: 5px 0; font-size: 0.9em;">{data["count"]} case(s)</p>
+                            </div>
+                            """,
+                                unsafe_allow_html=True,
+                            )
+
+                st.markdown("---")
+
+            analytics = cohort_analytics(
+                {
+                    team: data["cases"]
+                    for team, data in team_scores.items()
+                    if data["count"]
+                },
+                len(cases),
+            )
+            team_index = {team: i for i, team in enumerate(analytics["teams"])}
+
+            # Detailed standings table
+            st.markdown("### 📋 Detailed Standings")
+
+            for idx, (team_name, data) in enumerate(sorted_teams):
+                rank = idx + 1
+                avg_score = data["total"] / data["count"] if data["count"] > 0 else 0
+                submitted = data["count"] + len(data["provisional"])
+
+                if not data["count"]:
+                    medal = "⏳"
+                else:
+                    medal = (
+                        "🥇"
+                        if rank == 1
+                        else ("🥈" if rank == 2 else "🥉" if rank == 3 else f"#{rank}")
+                    )
+
+                provisional_note = (
+                    f" · {len(data['provisional'])} awaiting AI grade"
+                    if data["provisional"]
+                    else ""
+                )
+
+                with st.expander(
+                    f"{medal} {team_name} - Total: {data['total']:,} pts (Avg: {avg_score:.1f}/100){provisional_note}",
+                    expanded=(rank <= 3),
+                ):
+                    st.markdown(
+                        f"**Cases Graded:** {data['count']}/{len(cases)}"
+                        + (f" ({submitted} submitted)" if data["provisional"] else "")
+                    )
+                    if team_name in team_index:
+                        i = team_index[team_name]
+                        st.caption(
+                            f"📐 Normalized rank #{analytics['rank'][i]} "
+                            f"(range #{analytics['rank_low'][i]}–#{analytics['rank_high'][i]}) · "
+                            f"avg z-score {analytics['normalized'][i]:+.2f} · "
+                            f"avg case percentile {analytics['percentile'][i]:.0f}"
+                        )
+                    if data["provisional"]:
+                        st.caption(
+                            "⏳ Provisional (keyword coverage) scores are shown for reference "
+                            "only and do not count toward the total or rank"
+                        )
+
+                    # Show scores per case, graded first
+                    scores = [
+                        (case_num, score, False)
+                        for case_num, score in sorted(data["cases"].items())
+                    ] + [
+                        (case_num, score, True)
+                        for case_num, score in sorted(data["provisional"].items())
+                    ]
+                    case_cols = st.columns(min(5, len(scores)))
+
+                    for i, (case_num, score, provisional) in enumerate(scores):
+                        col_idx = i % 5
+                        with case_cols[col_idx]:
+                            score_color = (
+                                "🟢" if score >= 80 else "🟡" if score >= 60 else "🔴"
+                            )
+                            st.metric(
+                                label=(
+                                    f"Case {case_num} (provisional, not counted)"
+                                    if provisional
+                                    else f"Case {case_num}"
+                                ),
+                                value=f"{score}/100",
+                                delta=f"{score_color}",
+                            )
+
+                    # Progress bar
+                    completion_rate = (data["count"] / len(cases)) * 100
+                    st.progress(data["count"] / len(cases))
+                    st.caption(
+                        f"Graded: {completion_rate:.0f}% ({data['count']}/{len(cases)} cases)"
+                    )
+
+            st.markdown("---")
+            render_cohort_analytics(analytics, cases)
+
+
+def ranking_key(team_data: Dict):
+    """Case leaderboard order: graded teams by score, then pending teams"""
+    return (not team_data["evaluation"].get("pending"), team_data["score"])
+
+
+def render_case_view(cases: List[Dict], form_id: str):
+    """Case description, management, and team responses for the selected case"""
+    # Original case view
+    st.sidebar.markdown("Select a case to review:")
+
+    # Create case selection
+    case_options = [f"Case {i+1}" for i in range(len(cases))]
+    selected_case_idx = st.sidebar.radio(
+        "Cases",
+        range(len(cases)),
+        format_func=lambda x: f"📌 {case_options[x]}: {cases[x]['title'].replace('Case ' + str(x+1) + ':', '').strip()[:30]}...",
+    )
+
+    # Display selected case
+    selected_case = cases[selected_case_idx]
+
+    st.header(selected_case["title"])
+
+    # Create tabs
+    tab1, tab2, tab3 = st.tabs(
+        ["📋 Case Description", "💊 Management Considerations", "👥 Team Responses"]
+    )
+
+    # Tab 1: Description
+    with tab1:
+        st.markdown(selected_case["description"])
+
+    # Tab 2: Management
+    with tab2:
+        st.markdown(selected_case["management"])
+
+    # Tab 3: Team Responses
+    with tab3:
+        st.subheader("Team Responses & AI Evaluation")
+
+        # Add option to manually test with custom response
+        with st.expander("🧪 Test with Custom Response (Optional)"):
+            st.markdown(
+                "Enter a response below to get AI evaluation without using Tally API:"
+            )
+            test_team_name = st.text_input(
+                "Team Name", value="Test Team", key=f"test_team_{selected_case_idx}"
+            )
+            test_response = st.text_area(
+                "Management Response",
+                height=150,
+                placeholder="Enter the team's management plan here...",
+                key=f"test_response_{selected_case_idx}",
+            )
+            if st.button(
+                "🤖 Evaluate This Response", key=f"eval_btn_{selected_case_idx}"
+            ):
+                if test_response.strip():
+                    with st.spinner("AI is evaluating the response..."):
+                        evaluation = evaluate_response(
+                            selected_case_idx + 1,
+                            selected_case,
+                            test_response,
+                            form_id=form_id,
+                        )
+                    test_data = {
+                        "team": test_team_name,
+                        "response": test_response,
+                        "submitted_at": "2026-02-13 (Manual Test)",
+                    }
+                    st.markdown("---")
+                    display_team_response(test_data["team"], test_data, evaluation)
+                else:
+                    st.warning("Please enter a response to evaluate.")
+
+        st.markdown("---")
+        st.markdown("### 📊 Tally.so Submissions")
+
+        with st.spinner("Loading team responses from Tally.so..."):
+            # Fetch responses
+            all_responses = get_submissions(form_id=form_id)
+
+            if not all_responses:
+                st.info("No team responses have been submitted yet.")
+
+            else:
+                # Filter responses for current case
+                case_number = selected_case_idx + 1
+                all_case_responses = categorize_responses_by_case(
+                    all_responses, case_number
+                )
+                case_responses = deduplicate_responses(all_case_responses)
+                superseded = len(all_case_responses) - len(case_responses)
+
+                if not case_responses:
+                    st.info(f"No responses found for Case {case_number} yet.")
+                else:
+                    st.success(
+                        f"Found {len(case_responses)} team response(s) for this case"
+                    )
+                    if superseded:
+                        st.caption(
+                            f"{superseded} earlier resubmission(s) superseded by each team's latest response"
+                        )
+
+                    # Grades come from the shared store and pending grades
+                    # from the session cache, which also tracks whether this
+                    # case was graded here
+                    cache = session_cache()
+                    eval_key = f"{form_id}:evaluated_case_{case_number}"
+                    team_evaluations = [
+                        session_evaluation(
+                            form_id, case_number, selected_case, response_data
+                        )
+                        for response_data in case_responses
+                    ]
+                    evaluated = cache.get(eval_key)
+                    if evaluated is None:
+                        # Not graded in this session (or evicted): show the
+                        # results once every team has an evaluation
+                        evaluated = all(e is not None for e in team_evaluations)
+
+                    # First show team responses in tabs
+                    st.markdown("---")
+                    st.markdown("### 📋 Team Responses")
+
+                    tab_names = [
+                        response_data["team"] for response_data in case_responses
+                    ]
+                    tabs = st.tabs(tab_names)
+
+                    # Instant offline scores, shown before the AI grades arrive
+                    provisional = provisional_scores(
+                        selected_case["management"],
+                        [r["response"] for r in case_responses],
+                    )
+
+                    for tab, response_data, provisional_score in zip(
+                        tabs, case_responses, provisional
+                    ):
+                        with tab:
+                            st.markdown(f"### 👥 {response_data['team']}")
+                            st.caption(
+                                f"⚡ Provisional score: {provisional_score}/100 (keyword coverage of the reference management)"
+                            )
+                            with st.expander("📝 Team Response", expanded=True):
+                                st.markdown(response_data["response"])
+
+                            if response_data.get("submitted_at"):
+                                st.caption(
+                                    f"Submitted: {response_data['submitted_at']}"
+                                )
+
+                    # AI Evaluation Section
+                    st.markdown("---")
+                    st.markdown("### 🤖 AI Evaluation")
+
+                    # Button to trigger evaluation (evaluate all at once)
+                    if not evaluated:
+                        st.info(
+                            f"💡 Click below to evaluate **all {len(case_responses)} team(s)** at once using AI."
+                        )
+
+                        col1, col2, col3 = st.columns([1, 2, 1])
+                        with col2:
+                            if st.button(
+                                f"🚀 Evaluate All {len(case_responses)} Team(s) Now",
+                                key=f"eval_btn_{case_number}",
+                                type="primary",
+                                use_container_width=True,
+                            ):
+                                force_eval = st.session_state.pop(
+                                    f"{form_id}:force_eval_{case_number}", False
+                                )
+
+                                # Show progress
+                                progress_text = st.empty()
+                                progress_bar = st.progress(0)
+                                budget = batch_budget(len(case_responses))
+
+                                for idx, response_data in enumerate(case_responses):
+                                    progress_text.text(
+                                        f"Evaluating {response_data['team']}... ({idx+1}/{len(case_responses)})"
+                                    )
+                                    progress_bar.progress(
+                                        (idx + 1) / len(case_responses)
+                                    )
+
+                                    evaluation = evaluate_response(
+                                        case_number,
+                                        selected_case,
+                                        response_data["response"],
+                                        force=force_eval,
+                                        deadline=budget.next_deadline(),
+                                        form_id=form_id,
+                                    )
+                                    remember_evaluation(
+                                        form_id,
+                                        case_number,
+                                        response_data["team"],
+                                        evaluation,
+                                    )
+
+                                # Clear progress indicators
+                                progress_text.empty()
+                                progress_bar.empty()
+
+                                cache.put(eval_key, True)
+                                st.rerun()
+
+                    # Display evaluation results if available
+                    if evaluated:
+                        evaluated_teams = []
+                        for response_data, evaluation, provisional_score in zip(
+                            case_responses, team_evaluations, provisional
+                        ):
+                            if evaluation is None:
+                                # Submitted since this case was graded, or a
+                                # pending grade that was evicted
+                                evaluation = provisional_evaluation(
+                                    selected_case["management"],
+                                    response_data["response"],
+                                )
+                                evaluation.update(
+                                    pending=True, pending_reason="not graded yet"
+                                )
+                            evaluated_teams.append(
+                                {
+                                    "team": response_data["team"],
+                                    "response_data": response_data,
+                                    "evaluation": evaluation,
+                                    "score": evaluation["score"],
+                                    "provisional_score": int(provisional_score),
+                                }
+                            )
+
+                        # Sort by score (highest first), pending last
+                        evaluated_teams.sort(key=ranking_key, reverse=True)
+
+                        pending = [
+                            t for t in evaluated_teams if t["evaluation"].get("pending")
+                        ]
+
+                        # Display leaderboard
+                        if pending:
+                            st.success(
+                                f"✅ AI evaluation completed for {len(evaluated_teams) - len(pending)} "
+                                f"of {len(evaluated_teams)} team(s)"
+                            )
+                        else:
+                            st.success(
+                                f"✅ AI evaluation completed for all {len(evaluated_teams)} team(s)!"
+                            )
+                        st.markdown("### 🏆 Leaderboard")
+
+                        leaderboard_cols = st.columns(min(len(evaluated_teams), 3))
+                        for idx, team_data in enumerate(evaluated_teams):
+                            col_idx = idx % 3
+                            with leaderboard_cols[col_idx]:
+                                medal = (
+                                    "🥇"
+                                    if idx == 0
+                                    else (
+                                        "🥈" if idx == 1 else "🥉" if idx == 2 else "📊"
+                                    )
+                                )
+                                st.metric(
+                                    label=f"{medal} {team_data['team']}",
+                                    value=(
+                                        "⏳ Pending"
+                                        if team_data["evaluation"].get("pending")
+                                        else f"{team_data['score']}/100"
+                                    ),
+                                )
+
+                        # Report how well the offline scorer tracks the AI grades
+                        graded = [
+                            t
+                            for t in evaluated_teams
+                            if not t["evaluation"].get("provisional")
+                            and "provisional_score" in t
+                        ]
+                        agreement = score_agreement(
+                            [t["provisional_score"] for t in graded],
+                            [t["score"] for t in graded],
+                        )
+                        if agreement["n"]:
+                            correlation = (
+                                f"{agreement['correlation']:.2f}"
+                                if agreement["correlation"] is not None
+                                else "n/a"
+                            )
+                            st.caption(
+                                f"Provisional vs AI scores over {agreement['n']} team(s): "
+                                f"mean absolute difference {agreement['mae']:.1f} pts, correlation {correlation}"
+                            )
+                        if pending:
+                            st.warning(
+                                f"⏳ {len(pending)} team(s) are pending: AI grading did not finish in "
+                                "time or Groq is unavailable. Their provisional scores are shown instead."
+                            )
+                            if st.button(
+                                f"⏳ Grade {len(pending)} Pending Team(s)",
+                                key=f"pending_btn_{case_number}",
+                            ):
+                                budget = batch_budget(len(pending))
+                                with st.spinner("Grading pending teams..."):
+                                    for team_data in pending:
+                                        evaluation = evaluate_response(
+                                            case_number,
+                                            selected_case,
+                                            team_data["response_data"]["response"],
+                                            deadline=budget.next_deadline(),
+                                            form_id=form_id,
+                                        )
+                                        remember_evaluation(
+                                            form_id,
+                                            case_number,
+                                            team_data["team"],
+                                            evaluation,
+                                        )
+                                st.rerun()
+
+                        # Only the grades that depend on an edited case text,
+                        # prompt or model need regrading
+                        stale = [
+                            t
+                            for t in evaluated_teams
+                            if changed_inputs(t["evaluation"], selected_case)
+                        ]
+                        if stale:
+                            changed = sorted(
+                                {
+                                    name
+                                    for t in stale
+                                    for name in changed_inputs(
+                                        t["evaluation"], selected_case
+                                    )
+                                }
+                            )
+                            st.warning(
+                                f"⚠️ {len(stale)} evaluation(s) were graded against an older "
+                                f"version of this case ({', '.join(changed)} changed)."
+                            )
+                            if st.button(
+                                f"🔁 Regrade {len(stale)} Changed Evaluation(s)",
+                                key=f"regrade_btn_{case_number}",
+                            ):
+                                with st.spinner("Regrading changed evaluations..."):
+                                    for team_data in stale:
+                                        evaluation = evaluate_response(
+                                            case_number,
+                                            selected_case,
+                                            team_data["response_data"]["response"],
+                                            form_id=form_id,
+                                        )
+                                        remember_evaluation(
+                                            form_id,
+                                            case_number,
+                                            team_data["team"],
+                                            evaluation,
+                                        )
+                                st.rerun()
+
+                        st.markdown("---")
+                        st.markdown("### 📊 Detailed Evaluation (View One at a Time)")
+
+                        # Create tabs for each team with scores
+                        eval_tab_names = [
+                            (
+                                f"{team_data['team']} (⏳ pending)"
+                                if team_data["evaluation"].get("pending")
+                                else f"{team_data['team']} ({team_data['score']}/100)"
+                            )
+                            for team_data in evaluated_teams
+                        ]
+                        eval_tabs = st.tabs(eval_tab_names)
+
+                        # Display each team in its tab with full evaluation
+                        for eval_tab, team_data in zip(eval_tabs, evaluated_teams):
+                            with eval_tab:
+                                display_team_response(
+                                    team_data["team"],
+                                    team_data["response_data"],
+                                    team_data["evaluation"],
+                                )
+
+                        # Add button to re-evaluate
+                        st.markdown("---")
+                        col1, col2, col3 = st.columns([1, 2, 1])
+                        with col2:
+                            if st.button(
+                                "🔄 Re-evaluate All Teams",
+                                key=f"reeval_btn_{case_number}",
+                                use_container_width=True,
+                            ):
+                                cache.put(eval_key, False)
+                                # Regrade instead of reusing stored evaluations
+                                st.session_state[
+                                    f"{form_id}:force_eval_{case_number}"
+                                ] = True
+                                st.rerun()
+
+
+def main():
+    configure_page()
+
+    # Title
+    st.title("🏥 Resident CASE - Diabetes Management Scenarios")
+    st.markdown("*Interactive case-based learning with AI-powered evaluation*")
+    st.markdown("---")
+
+    warmup = start_warmup()
+    start_metrics_server()
+
+    # Load cases
+    try:
+        cases = load_cases()
+    except Exception as e:
+        st.error(f"Error loading cases: {e}")
+        st.info("Please ensure cases.md is in the same directory as this app.")
+        return
+
+    # Sidebar navigation
+    st.sidebar.title("📋 Navigation")
+
+    # Each cohort is a Tally form with its own submissions and evaluations
+    cohorts = get_cohorts()
+    if len(cohorts) > 1:
+        cohort = st.sidebar.selectbox("Cohort:", list(cohorts), key="cohort")
+    else:
+        cohort = next(iter(cohorts))
+    form_id = cohorts[cohort]
+    if len(cohorts) > 1:
+        st.caption(f"👥 Cohort: **{cohort}**")
+
+    # Add view selection
+    view_mode = st.sidebar.radio(
+        "Select View:",
+        ["📊 Overall Leaderboard", "📋 Individual Cases"],
+        index=1,  # Default to Cases view
+    )
+
+    st.sidebar.markdown("---")
+
+    if view_mode == "📊 Overall Leaderboard":
+        render_leaderboard(cases, form_id)
+    else:
+        render_case_view(cases, form_id)
+
+    # Footer
+    st.sidebar.markdown("---")
+    st.sidebar.markdown("### 🔥 Server Status")
+    display_warmup_status(warmup)
+    display_grading_status()
+    display_session_cache()
+    if st.sidebar.button("🔄 Sync Tally Now", key="sync_tally"):
+        with st.spinner("Syncing submissions from Tally.so..."):
+            sync_all_forms()
+        st.rerun()
+
+    st.sidebar.markdown("---")
+    st.sidebar.markdown("### ℹ️ About")
+    st.sidebar.info(
+        """
+    This application provides:
+    - 10 diabetes management cases
+    - Evidence-based guidelines
+    - Team response tracking
+    - AI-powered evaluation using Gemini
+    """
+    )
@@ -0,0 +1,108 @@
+import threading
+import time
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional, Tuple
+
+from residentcase.config import get_bool_setting
+
+# Readiness states shown in the sidebar
+PENDING = "pending"
+RUNNING = "running"
+READY = "ready"
+FAILED = "failed"
+
+
+class Warmup:
+    """Runs startup steps once per server process in a background thread
+
+    Each step is a (name, callable) pair; a callable's return value is kept
+    as the step's detail (e.g. "10 cases"). Steps run in order and a failing
+    step is recorded without stopping the ones after it, so a Tally outage
+    does not keep persisted evaluations from loading.
+    """
+
+    def __init__(self, steps: List[Tuple[str, Callable[[], Optional[str]]]]):
+        self.steps = steps
+        self.status = {name: PENDING for name, _ in steps}
+        self.details: Dict[str, str] = {}
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def start(self) -> "Warmup":
+        with self._lock:
+            if self._thread is None:
+                self.started_at = time.time()
+                self._thread = threading.Thread(
+                    target=self._run, name="residentcase-warmup", daemon=True
+                )
+                self._thread.start()
+        return self
+
+    def _run(self):
+        for name, step in self.steps:
+            self.status[name] = RUNNING
+            try:
+                detail = step()
+                self.status[name] = READY
+            except Exception as e:
+                detail = f"{type(e).__name__}: {e}"
+                self.status[name] = FAILED
+            if detail:
+                self.details[name] = str(detail)
+        self.finished_at = time.time()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until every step has run, returning whether warm-up finished"""
+        if self._thread is not None:
+            self._thread.join(timeout)
+        return self.is_finished
+
+    @property
+    def is_finished(self) -> bool:
+        return self.finished_at is not None
+
+    @property
+    def is_ready(self) -> bool:
+        return self.is_finished and all(s == READY for s in self.status.values())
+
+    @property
+    def elapsed(self) -> float:
+        if self.started_at is None:
+            return 0.0
+        return (self.finished_at or time.time()) - self.started_at
+
+
+def warmup_steps(
+    evaluate: bool = False,
+) -> List[Tuple[str, Callable[[], Optional[str]]]]:
+    """Startup steps: case catalog, stored evaluations, Tally sync, optional grading"""
+    from residentcase.catalog import load_cases
+    from residentcase.grading import evaluate_all_forms, get_evaluation_store
+    from residentcase.ingest import for_each_form, get_submissions
+
+    def preload() -> str:
+        loaded = for_each_form(lambda form_id: get_evaluation_store(form_id).preload())
+        return f"{sum(n for n in loaded.values() if isinstance(n, int))} evaluations"
+
+    def load_submissions() -> str:
+        # get() skips the fetch when a page view has just synced, and a page
+        # view arriving mid-fetch waits for this one instead of starting its own
+        loaded = for_each_form(lambda form_id: len(get_submissions(form_id=form_id)))
+        return f"{sum(n for n in loaded.values() if isinstance(n, int))} submissions"
+
+    steps = [
+        ("Case catalog", lambda: f"{len(load_cases())} cases"),
+        ("Stored evaluations", preload),
+        ("Tally submissions", load_submissions),
+    ]
+    if evaluate:
+        steps.append(("Ungraded responses", evaluate_all_forms))
+    return steps
+
+
+@lru_cache(maxsize=None)
+def start_warmup() -> Warmup:
+    """Warm the shared caches once per server process, before sessions need them"""
+    return Warmup(warmup_steps(get_bool_setting("WARMUP_EVALUATE"))).start()
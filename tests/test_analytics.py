@@ -0,0 +1,120 @@
+import numpy as np
+import pytest
+
+from residentcase.analytics import (
+    attempted_mean,
+    case_percentiles,
+    case_zscores,
+    cohort_analytics,
+    competition_ranks,
+    score_histograms,
+    score_matrix,
+)
+
+NAN = np.nan
+
+
+def test_score_matrix_marks_unattempted_as_nan():
+    teams, matrix = score_matrix({"A": {1: 80, 3: 60}, "B": {2: 50}}, 3)
+    assert teams == ["A", "B"]
+    np.testing.assert_array_equal(matrix, [[80, NAN, 60], [NAN, 50, NAN]])
+
+
+def test_zscores_per_case():
+    matrix = np.array([[90.0, 50.0], [70.0, 50.0], [NAN, NAN]])
+    z = case_zscores(matrix)
+    np.testing.assert_allclose(z[:2, 0], [1.0, -1.0])
+    # No spread in a case gives 0, not NaN; unattempted stays NaN
+    np.testing.assert_array_equal(z[:2, 1], [0.0, 0.0])
+    assert np.isnan(z[2]).all()
+
+
+def test_percentiles_count_ties_half():
+    matrix = np.array([[10.0], [20.0], [20.0], [NAN]])
+    np.testing.assert_allclose(
+        case_percentiles(matrix)[:3, 0], [100 * 0.5 / 3, 100 * 2 / 3, 100 * 2 / 3]
+    )
+    assert np.isnan(case_percentiles(matrix)[3, 0])
+
+
+def test_attempted_mean_ignores_skipped_cases():
+    matrix = np.array([[80.0, NAN], [NAN, NAN]])
+    means = attempted_mean(matrix)
+    assert means[0] == 80.0
+    assert np.isnan(means[1])
+
+
+def test_competition_ranks_put_nan_last():
+    np.testing.assert_array_equal(
+        competition_ranks(np.array([0.5, NAN, 2.0, 0.5])), [2, 4, 1, 2]
+    )
+
+
+def test_competition_ranks_share_ties_along_axis():
+    samples = np.array([[3.0, 3.0, 1.0], [2.0, 5.0, 2.0]])
+    np.testing.assert_array_equal(competition_ranks(samples), [[1, 1, 3], [2, 1, 2]])
+    np.testing.assert_array_equal(
+        competition_ranks(samples, axis=0), [[1, 2, 2], [2, 1, 1]]
+    )
+
+
+def test_tied_teams_share_rank_and_interval():
+    team_cases = {"A": {1: 80, 2: 60}, "B": {1: 80, 2: 60}, "C": {1: 50, 2: 40}}
+    result = cohort_analytics(team_cases, 2, samples=200)
+
+    assert list(result["rank"]) == [1, 1, 3]
+    assert list(result["rank_low"]) == [1, 1, 3]
+    assert list(result["rank_high"]) == [1, 1, 3]
+    assert list(result["stability"]) == [1.0, 1.0, 1.0]
+
+
+def test_histograms_count_attempted_scores():
+    matrix = np.array([[0.0, 100.0], [55.0, NAN]])
+    histograms = score_histograms(matrix, bins=10)
+    assert histograms.shape == (2, 10)
+    assert histograms[0, 0] == 1 and histograms[0, 5] == 1
+    # 100 falls in the top bin rather than past it
+    assert histograms[1, 9] == 1
+    assert histograms.sum() == 3
+
+
+def test_cohort_analytics_averages_attempted_cases():
+    # B skipped the hard case 2; its average covers case 1 only
+    team_cases = {
+        "A": {1: 90, 2: 40},
+        "B": {1: 90},
+        "C": {1: 60, 2: 20},
+    }
+    result = cohort_analytics(team_cases, 2, samples=200)
+
+    assert result["teams"] == ["A", "B", "C"]
+    assert list(result["attempted"]) == [2, 1, 2]
+    assert result["average"][1] == 90.0
+    assert result["rank"][2] == 3
+    assert (result["rank_low"] <= result["rank"]).all()
+    assert (result["rank"] <= result["rank_high"]).all()
+    assert ((0 <= result["stability"]) & (result["stability"] <= 1)).all()
+
+
+def test_bootstrap_is_reproducible():
+    team_cases = {
+        f"T{t}": {c: (t * 7 + c * 13) % 100 for c in (1, 2, 3)} for t in range(6)
+    }
+    first = cohort_analytics(team_cases, 3, samples=100)
+    second = cohort_analytics(team_cases, 3, samples=100)
+    np.testing.assert_array_equal(first["rank_low"], second["rank_low"])
+    np.testing.assert_array_equal(first["stability"], second["stability"])
+
+
+def test_empty_cohort():
+    result = cohort_analytics({}, 3)
+    assert result["teams"] == []
+    assert result["rank"].shape == (0,)
+    assert result["histograms"].shape == (3, 10)
+
+
+@pytest.mark.parametrize("case_count", [1, 5])
+def test_single_team(case_count):
+    result = cohort_analytics({"A": {1: 70}}, case_count)
+    assert list(result["rank"]) == [1]
+    assert result["stability"][0] == 1.0
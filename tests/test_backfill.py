@@ -0,0 +1,145 @@
+import pytest
+
+from residentcase import ingest
+from residentcase.ingest import backfill_submissions
+from residentcase.store import SubmissionStore
+
+PAGE_SIZE = 10
+
+
+class FakeTally:
+    """Paged submissions endpoint, newest first, that can fail given pages"""
+
+    def __init__(self, count: int):
+        self.submissions = []
+        self.add(count)
+        self.failing = set()
+        self.fetched = []
+
+    def add(self, count: int):
+        start = len(self.submissions)
+        new = [
+            {"id": f"s{n}", "submittedAt": f"2026-01-01T00:00:{n:05d}"}
+            for n in range(start, start + count)
+        ]
+        self.submissions = list(reversed(new)) + self.submissions
+
+    def __call__(self, page, limit, form_id=None, session=None):
+        self.fetched.append(page)
+        if page in self.failing:
+            raise ConnectionError(f"page {page} unavailable")
+        return {
+            "submissions": self.submissions[(page - 1) * limit : page * limit],
+            "hasMore": page * limit < len(self.submissions),
+            "totalNumberOfSubmissionsPerFilter": {"all": len(self.submissions)},
+        }
+
+
+@pytest.fixture
+def tally(monkeypatch):
+    fake = FakeTally(25)
+    monkeypatch.setattr(ingest, "fetch_tally_page", fake)
+    return fake
+
+
+@pytest.fixture
+def store():
+    return SubmissionStore(":memory:")
+
+
+def backfill(store, **kwargs):
+    return backfill_submissions(
+        store, form_id="form", page_size=PAGE_SIZE, max_workers=2, **kwargs
+    )
+
+
+def ids(store):
+    return {s["id"] for s in store.all()}
+
+
+def test_fetches_every_page(tally, store):
+    result = backfill(store)
+
+    assert result["pages"] == 3
+    assert result["fetched"] == 3
+    assert result["failed"] == []
+    assert ids(store) == {s["id"] for s in tally.submissions}
+    assert store.backfill_state("form:10") == (25, {1, 2, 3})
+
+
+def test_resumes_after_failed_page(tally, store):
+    tally.failing = {3}
+    result = backfill(store)
+    assert result["failed"] == [3]
+    assert store.backfill_state("form:10") == (25, {1, 2})
+
+    tally.failing = set()
+    tally.fetched = []
+    result = backfill(store)
+
+    # Page 1 always comes first for the total; page 2 is not fetched again
+    assert sorted(tally.fetched) == [1, 3]
+    assert result["skipped"] == 1
+    assert store.count() == 25
+
+
+def test_refetches_pages_shifted_by_new_submissions(tally, store):
+    tally.failing = {3}
+    backfill(store)
+
+    # Twelve newer submissions push older ones two pages further back
+    tally.add(12)
+    tally.failing = set()
+    tally.fetched = []
+    result = backfill(store)
+
+    assert result["pages"] == 4
+    assert sorted(tally.fetched) == [1, 2, 3, 4]
+    assert ids(store) == {s["id"] for s in tally.submissions}
+    assert store.backfill_state("form:10") == (37, {1, 2, 3, 4})
+
+
+def test_rerun_after_completion_only_checks_first_page(tally, store):
+    backfill(store)
+    tally.fetched = []
+
+    result = backfill(store)
+
+    assert tally.fetched == [1]
+    assert result["skipped"] == 2
+    assert store.count() == 25
+
+
+def test_restart_refetches_everything(tally, store):
+    backfill(store)
+    tally.fetched = []
+
+    backfill(store, restart=True)
+
+    assert sorted(tally.fetched) == [1, 2, 3]
+
+
+def test_progress_reports_each_page(tally, store):
+    calls = []
+    backfill(store, progress=lambda done, total: calls.append((done, total)))
+    assert calls[0] == (1, 3)
+    assert calls[-1] == (3, 3)
+
+
+def test_start_backfill_keeps_only_given_pages(store):
+    store.write_page("run", 1, [{"id": "a"}])
+    store.write_page("run", 2, [{"id": "b"}])
+    store.write_page("run", 3, [{"id": "c"}])
+
+    store.start_backfill("run", 40, {1, 3})
+
+    assert store.backfill_state("run") == (40, {1, 3})
+    # Submissions already written are kept
+    assert store.count() == 3
+
+
+def test_write_page_is_idempotent(store):
+    store.write_page("run", 1, [{"id": "a"}, {"id": "b"}])
+    store.write_page("run", 1, [{"id": "a"}, {"id": "b"}])
+    assert store.count() == 2
+    assert store.backfill_state("run") == (None, {1})
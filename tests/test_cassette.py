@@ -0,0 +1,83 @@
+import json
+
+import pytest
+
+from residentcase import grading
+from residentcase.cassette import (
+    RECORD,
+    REPLAY,
+    Cassette,
+    CassetteMiss,
+    request_key,
+    use_cassette,
+)
+
+GROQ_URL = f"{grading.GROQ_API_BASE}/chat/completions"
+
+
+@pytest.fixture
+def recording(tmp_path):
+    """A cassette holding one Groq reply, keyed on the full request"""
+    payload = grading.completion_payload("old system prompt", "old prompt")
+    interaction = {
+        "key": request_key("POST", GROQ_URL, None, payload),
+        "method": "POST",
+        "url": GROQ_URL,
+        "status": 200,
+        "headers": {"Content-Type": "application/json"},
+        "body": json.dumps(
+            {"choices": [{"message": {"content": "SCORE: 65"}}], "usage": {}}
+        ),
+        "elapsed": 0.5,
+    }
+    path = tmp_path / "run.jsonl"
+    path.write_text(json.dumps(interaction) + "\n")
+    return str(path)
+
+
+def test_replay_miss_propagates_from_grading(recording, monkeypatch):
+    monkeypatch.setattr(grading, "get_grading_breaker", lambda: _always_closed())
+    with use_cassette(recording, REPLAY, latency_scale=0):
+        with pytest.raises(CassetteMiss, match="re-record"):
+            grading.rate_response_with_gemini("case", "guideline", "response")
+
+
+def test_url_matching_replays_after_prompt_change(recording, monkeypatch):
+    monkeypatch.setattr(grading, "get_grading_breaker", lambda: _always_closed())
+    with use_cassette(recording, REPLAY, latency_scale=0, match_url=True):
+        evaluation = grading.rate_response_with_gemini("case", "guideline", "response")
+    assert evaluation["score"] == 65
+
+
+def test_url_matching_repeats_last_reply(recording):
+    cassette = Cassette(recording, REPLAY, latency_scale=0, match_url=True)
+    key = cassette.key("POST", GROQ_URL, None, {"any": "body"})
+    first = cassette.replay(key, "POST", GROQ_URL)
+    second = cassette.replay(key, "POST", GROQ_URL)
+    assert first.json() == second.json()
+
+
+def test_rerecording_replaces_old_replies(recording):
+    class Reply:
+        status_code = 200
+        headers = {"Content-Type": "application/json"}
+
+        def __init__(self, score):
+            self.content = json.dumps(
+                {"choices": [{"message": {"content": f"SCORE: {score}"}}]}
+            ).encode()
+
+    cassette = Cassette(recording, RECORD)
+    key = cassette.key("POST", GROQ_URL, None, {"any": "body"})
+    cassette.record(key, "POST", GROQ_URL, Reply(80), 0.1)
+
+    cassette = Cassette(recording, REPLAY, latency_scale=0)
+    assert len(cassette) == 1
+    reply = cassette.replay(key, "POST", GROQ_URL)
+    assert reply.json()["choices"][0]["message"]["content"] == "SCORE: 80"
+
+
+def _always_closed():
+    from residentcase.resilience import CircuitBreaker
+
+    return CircuitBreaker(lambda: True, min_calls=1000)
@@ -0,0 +1,65 @@
+from residentcase.catalog import load_cases
+from residentcase.compaction import (
+    compact_case_text,
+    compact_text,
+    compaction_report,
+    estimate_tokens,
+    normalize_whitespace,
+    strip_citations,
+    strip_markdown,
+)
+
+
+def test_normalize_whitespace():
+    text = "  Line one   \n\n   \nLine    two\t\n"
+    assert normalize_whitespace(text) == "Line one\nLine two"
+
+
+def test_normalize_whitespace_keeps_indentation():
+    assert normalize_whitespace("- a\n  - b") == "- a\n  - b"
+
+
+def test_strip_citations():
+    assert strip_citations("Start metformin \\[1\\]\\[2\\].") == "Start metformin."
+    assert strip_citations("See guideline [3, 4] and [5-7]") == "See guideline and"
+
+
+def test_strip_markdown_keeps_bullets():
+    text = "## Plan\n---\n- **Metformin** first\n* __Diet__"
+    assert strip_markdown(text) == "Plan\n- Metformin first\n* Diet"
+
+
+def test_compact_text_is_stable():
+    text = "### Case\n\n- **Start** metformin \\[1\\]  \n\n***\n- Recheck HbA1c [2]\n"
+    compacted = compact_text(text)
+    assert compacted == "Case\n- Start metformin\n- Recheck HbA1c"
+    assert compact_text(compacted) == compacted
+
+
+def test_compact_case_text_is_cached():
+    compact_case_text.cache_clear()
+    compact_case_text("- **a**")
+    compact_case_text("- **a**")
+    assert compact_case_text.cache_info().hits == 1
+
+
+def test_estimate_tokens():
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("abcd") == 1
+    assert estimate_tokens("abcde") == 2
+
+
+def test_report_shrinks_real_cases():
+    cases = load_cases()
+    texts = [c["description"] for c in cases] + [c["management"] for c in cases]
+    report = compaction_report(texts)
+
+    assert list(report) == [
+        "original",
+        "whitespace",
+        "citations",
+        "markdown",
+        "compacted",
+    ]
+    assert report["compacted"] < report["original"]
+    assert report["compacted"] == sum(estimate_tokens(compact_text(t)) for t in texts)
@@ -0,0 +1,134 @@
+import pytest
+
+from residentcase import config, grading
+from residentcase.grading import (
+    evaluate_response,
+    evaluation_inputs,
+    find_stale_evaluations,
+    regrade_stale,
+)
+from residentcase.store import EvaluationStore, response_hash
+
+CASES = [
+    {"description": "55M with new diabetes", "management": "- Start metformin"},
+    {"description": "62F with CKD", "management": "- Start an SGLT2 inhibitor"},
+]
+
+
+def submission(team_number, case_number, management, submitted_at="2026-01-01"):
+    """Tally submission in the form's questionId layout"""
+    return {
+        "submittedAt": submitted_at,
+        "responses": [
+            {"questionId": "oAR5MN", "answer": [str(team_number)]},
+            {"questionId": "GrpqdO", "answer": {"case_number": str(case_number)}},
+            {"questionId": "PA9b5x", "answer": management},
+        ],
+    }
+
+
+SUBMISSIONS = [
+    submission(1, 1, "Metformin"),
+    submission(1, 2, "SGLT2 inhibitor"),
+    submission(2, 2, "Insulin"),
+]
+
+
+class FakeGrader:
+    """Stands in for the Groq call, counting the responses it grades"""
+
+    def __init__(self):
+        self.graded = []
+
+    def __call__(self, case_description, management, response, deadline=None):
+        self.graded.append(response)
+        return {"score": 70, "full_evaluation": "SCORE: 70"}
+
+
+@pytest.fixture
+def evaluations(tmp_path, monkeypatch):
+    store = EvaluationStore(str(tmp_path / "evaluations.sqlite3"))
+    monkeypatch.setattr(grading, "get_evaluation_store", lambda form_id=None: store)
+    monkeypatch.setitem(config._overrides, "PROMPT_COMPACTION", True)
+    return store
+
+
+@pytest.fixture
+def grader(monkeypatch):
+    fake = FakeGrader()
+    monkeypatch.setattr(grading, "rate_response_with_gemini", fake)
+    return fake
+
+
+def response_text(management):
+    return f"**Management:**\n{management}"
+
+
+def grade_all(cases):
+    for sub in SUBMISSIONS:
+        case_number = int(sub["responses"][1]["answer"]["case_number"])
+        management = sub["responses"][2]["answer"]
+        evaluate_response(
+            case_number, cases[case_number - 1], response_text(management)
+        )
+
+
+def test_editing_one_case_only_marks_that_case_stale(evaluations, grader):
+    grade_all(CASES)
+    assert find_stale_evaluations(CASES, SUBMISSIONS) == {}
+
+    edited = [CASES[0], {**CASES[1], "management": "- Start dapagliflozin"}]
+    stale = find_stale_evaluations(edited, SUBMISSIONS)
+
+    assert list(stale) == [2]
+    assert [item["team"] for item in stale[2]] == ["Team 1", "Team 2"]
+    assert all(item["changed"] == ["management"] for item in stale[2])
+
+
+def test_toggling_compaction_marks_every_evaluation_stale(
+    evaluations, grader, monkeypatch
+):
+    grade_all(CASES)
+    monkeypatch.setitem(config._overrides, "PROMPT_COMPACTION", False)
+
+    stale = find_stale_evaluations(CASES, SUBMISSIONS)
+
+    assert sorted(stale) == [1, 2]
+    assert sum(len(items) for items in stale.values()) == len(SUBMISSIONS)
+    assert all(
+        item["changed"] == ["prompt"] for items in stale.values() for item in items
+    )
+
+
+def test_legacy_evaluations_without_inputs_are_current(evaluations, grader):
+    response = response_text("Metformin")
+    evaluations.put(1, response_hash(response), {"score": 55})
+
+    assert find_stale_evaluations(CASES, SUBMISSIONS[:1]) == {}
+    assert evaluate_response(1, CASES[0], response)["score"] == 55
+    assert grader.graded == []
+
+
+def test_changed_inputs_bypass_the_stored_evaluation(evaluations, grader):
+    response = response_text("Metformin")
+    evaluate_response(1, CASES[0], response)
+    evaluate_response(1, CASES[0], response)
+    assert len(grader.graded) == 1
+
+    edited = {**CASES[0], "description": "55M with new diabetes and CKD"}
+    evaluation = evaluate_response(1, edited, response)
+
+    assert len(grader.graded) == 2
+    assert evaluation["inputs"] == evaluation_inputs(edited)
+
+
+def test_regrade_stale_only_regrades_changed_cases(evaluations, grader, monkeypatch):
+    grade_all(CASES)
+    grader.graded = []
+    edited = [{**CASES[0], "management": "- Start metformin 500 mg"}, CASES[1]]
+    monkeypatch.setattr(grading, "load_cases", lambda cases_file=None: edited)
+    monkeypatch.setattr(grading, "get_submissions", lambda form_id=None: SUBMISSIONS)
+
+    assert regrade_stale() == "1 evaluation(s) regraded"
+    assert grader.graded == [response_text("Metformin")]
+    assert find_stale_evaluations(edited, SUBMISSIONS) == {}
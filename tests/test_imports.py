@@ -0,0 +1,26 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Loaded on first use, so the CLI and the warm-up thread start quickly
+LAZY = ("numpy", "requests", "http.server", "tomllib", "streamlit")
+
+
+@pytest.mark.parametrize(
+    "module",
+    ["residentcase.ingest", "residentcase.grading", "residentcase.warmup"],
+)
+def test_core_modules_import_without_heavy_dependencies(module):
+    code = f"import sys, {module}; print(' '.join(m for m in {LAZY!r} if m in sys.modules))"
+    loaded = subprocess.run(
+        [sys.executable, "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+        cwd=ROOT,
+    ).stdout.split()
+    assert loaded == []
@@ -0,0 +1,61 @@
+from residentcase.ingest import categorize_responses_by_case, deduplicate_responses
+
+
+def submission(submitted_at, management, team_number=None, team_name=None):
+    """Tally submission for case 1 in the form's questionId layout"""
+    responses = [
+        {"questionId": "GrpqdO", "answer": {"case_number": "1"}},
+        {"questionId": "PA9b5x", "answer": management},
+    ]
+    if team_number is not None:
+        responses.append({"questionId": "oAR5MN", "answer": [str(team_number)]})
+    if team_name is not None:
+        responses.append({"questionId": "OAXb5M", "answer": team_name})
+    return {"submittedAt": submitted_at, "responses": responses}
+
+
+def latest(*submissions):
+    return deduplicate_responses(categorize_responses_by_case(list(submissions), 1))
+
+
+def test_latest_submission_wins_regardless_of_order():
+    responses = latest(
+        submission("2026-01-01T10:00:00Z", "second", team_number=1),
+        submission("2026-01-01T09:00:00Z", "first", team_number=1),
+        submission("2026-01-01T11:00:00Z", "third", team_number=1),
+    )
+    assert [r["response"] for r in responses] == ["**Management:**\nthird"]
+
+
+def test_team_number_is_the_key_when_present():
+    # A renamed team is still the same team
+    responses = latest(
+        submission("2026-01-01T09:00:00Z", "old", team_number=3, team_name="Alpha"),
+        submission("2026-01-01T10:00:00Z", "new", team_number=3, team_name="Beta"),
+        submission("2026-01-01T09:30:00Z", "other", team_number=4, team_name="Alpha"),
+    )
+    assert sorted(r["team"] for r in responses) == ["Team 3 - Beta", "Team 4 - Alpha"]
+
+
+def test_team_name_is_the_key_without_a_number():
+    responses = latest(
+        submission("2026-01-01T09:00:00Z", "old", team_name="Alpha"),
+        submission("2026-01-01T10:00:00Z", "new", team_name="Alpha"),
+        submission("2026-01-01T09:30:00Z", "other", team_name="Beta"),
+    )
+    assert {r["team"]: r["response"] for r in responses} == {
+        "Alpha": "**Management:**\nnew",
+        "Beta": "**Management:**\nother",
+    }
+
+
+def test_other_cases_are_kept_apart():
+    case_two = submission("2026-01-01T10:00:00Z", "case two", team_number=1)
+    case_two["responses"][0]["answer"] = {"case_number": "2"}
+    responses = deduplicate_responses(
+        categorize_responses_by_case(
+            [submission("2026-01-01T09:00:00Z", "case one", team_number=1)], 1
+        )
+        + categorize_responses_by_case([case_two], 2)
+    )
+    assert len(responses) == 2
@@ -0,0 +1,94 @@
+from urllib.request import urlopen
+
+import pytest
+
+from residentcase import metrics
+from residentcase.metrics import (
+    CONTENT_TYPE,
+    Counter,
+    Histogram,
+    Registry,
+    cache_hit_ratio,
+    serve_metrics,
+)
+
+
+def test_unlabeled_counter_is_exposed_before_first_inc():
+    counter = Counter("test_events_total", "Events")
+    assert counter.samples() == ["test_events_total 0"]
+    counter.inc()
+    counter.inc(2)
+    assert counter.samples() == ["test_events_total 3"]
+
+
+def test_labeled_counter_exposes_each_label_set():
+    counter = Counter("test_requests_total", "Requests", ["status"])
+    assert counter.samples() == []
+    counter.inc(status="500")
+    counter.inc(status="200")
+    counter.inc(status="200")
+    assert counter.samples() == [
+        'test_requests_total{status="200"} 2',
+        'test_requests_total{status="500"} 1',
+    ]
+    assert counter.value(status="404") == 0
+
+
+def test_labels_must_match_labelnames():
+    counter = Counter("test_requests_total", "Requests", ["status"])
+    with pytest.raises(ValueError, match="expects labels"):
+        counter.inc()
+    with pytest.raises(ValueError, match="expects labels"):
+        counter.inc(status="200", form="f1")
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = Histogram("test_seconds", "Latency", ["form"], buckets=(0.5, 1.0))
+    # 1.0 sits exactly on a bucket boundary and counts toward le="1"
+    for value in (0.1, 1.0, 4.0):
+        histogram.observe(value, form="f1")
+
+    assert histogram.samples() == [
+        'test_seconds_bucket{form="f1",le="0.5"} 1',
+        'test_seconds_bucket{form="f1",le="1"} 2',
+        'test_seconds_bucket{form="f1",le="+Inf"} 3',
+        'test_seconds_sum{form="f1"} 5.1',
+        'test_seconds_count{form="f1"} 3',
+    ]
+    assert histogram.count(form="f1") == 3
+
+
+def test_exposition_has_help_and_type():
+    registry = Registry()
+    registry.register(Counter("test_events_total", "Events seen"))
+    assert registry.expose() == (
+        "# HELP test_events_total Events seen\n"
+        "# TYPE test_events_total counter\n"
+        "test_events_total 0\n"
+    )
+    with pytest.raises(ValueError, match="already registered"):
+        registry.register(Counter("test_events_total", "Again"))
+
+
+def test_cache_hit_ratio(monkeypatch):
+    lookups = Counter("test_lookups_total", "Lookups", ["result"])
+    monkeypatch.setattr(metrics, "CACHE_LOOKUPS", lookups)
+    assert cache_hit_ratio() == 0.0
+
+    lookups.inc(3, result="hit")
+    lookups.inc(result="miss")
+    assert cache_hit_ratio() == 0.75
+
+
+def test_serve_metrics_scrape():
+    server = serve_metrics(0)
+    try:
+        port = server.server_address[1]
+        with urlopen(f"http://127.0.0.1:{port}/metrics", timeout=5) as response:
+            assert response.headers["Content-Type"] == CONTENT_TYPE
+            body = response.read().decode("utf-8")
+    finally:
+        server.shutdown()
+        server.server_close()
+    assert "# TYPE residentcase_evaluations_total counter" in body
+    assert "residentcase_groq_retries_total " in body
@@ -0,0 +1,150 @@
+import time
+
+import pytest
+import requests
+
+from residentcase import grading
+from residentcase.resilience import CLOSED, OPEN, CircuitBreaker, DeadlineBudget
+
+
+def never_recovers() -> bool:
+    return False
+
+
+def test_breaker_stays_closed_below_min_calls():
+    breaker = CircuitBreaker(never_recovers, min_calls=4, cooldown=60)
+    for _ in range(3):
+        breaker.record(False)
+    assert breaker.state == CLOSED
+    assert breaker.allow()
+
+
+def test_breaker_opens_at_threshold():
+    breaker = CircuitBreaker(never_recovers, min_calls=4, threshold=0.5, cooldown=60)
+    for success in (True, True, False):
+        breaker.record(success)
+    assert breaker.allow()
+    breaker.record(False)
+    assert breaker.state == OPEN
+    assert not breaker.allow()
+
+
+def test_breaker_window_forgets_old_failures():
+    breaker = CircuitBreaker(never_recovers, window=4, min_calls=4, cooldown=60)
+    for success in (False, True, True, True, True, False):
+        breaker.record(success)
+    assert breaker.failure_rate == 0.25
+    assert breaker.allow()
+
+
+def test_breaker_closes_when_probe_succeeds():
+    breaker = CircuitBreaker(lambda: True, min_calls=1, cooldown=0.01)
+    breaker.record(False)
+    assert breaker.state == OPEN
+    for _ in range(200):
+        if breaker.state == CLOSED:
+            break
+        time.sleep(0.01)
+    assert breaker.allow()
+    assert breaker.failure_rate == 0.0
+
+
+def test_budget_gives_each_call_the_whole_remaining_time():
+    # 200 calls in 180 s must not mean 0.9 s per call
+    budget = DeadlineBudget(180, 200)
+    deadlines = [budget.next_deadline() for _ in range(200)]
+    assert all(d - time.monotonic() > 170 for d in deadlines)
+    assert budget.calls_left == 0
+    assert not budget.exhausted
+
+
+def test_budget_exhausted_after_deadline():
+    budget = DeadlineBudget(0.01, 3)
+    time.sleep(0.02)
+    assert budget.exhausted
+    assert budget.remaining == 0.0
+
+
+class FakeGroq:
+    """Stands in for post_completion, replying with a status or raising"""
+
+    def __init__(self, outcome):
+        self.outcome = outcome
+        self.timeouts = []
+
+    def __call__(self, payload, timeout):
+        self.timeouts.append(timeout)
+        if isinstance(self.outcome, Exception):
+            raise self.outcome
+        response = requests.Response()
+        response.status_code = self.outcome
+        response.url = f"{grading.GROQ_API_BASE}/chat/completions"
+        response._content = (
+            b'{"choices": [{"message": {"content": "SCORE: 70"}}], "usage": {}}'
+        )
+        return response
+
+
+@pytest.fixture
+def breaker(monkeypatch):
+    breaker = CircuitBreaker(never_recovers, min_calls=1, threshold=0.5, cooldown=60)
+    monkeypatch.setattr(grading, "get_grading_breaker", lambda: breaker)
+    return breaker
+
+
+def grade(monkeypatch, outcome, deadline=None):
+    fake = FakeGroq(outcome)
+    monkeypatch.setattr(grading, "post_completion", fake)
+    evaluation = grading.rate_response_with_gemini(
+        "case", "guideline", "response", deadline=deadline
+    )
+    return evaluation, fake
+
+
+def test_success_is_recorded(monkeypatch, breaker):
+    evaluation, fake = grade(monkeypatch, 200)
+    assert evaluation["score"] == 70
+    assert fake.timeouts == [grading.REQUEST_TIMEOUT]
+    assert list(breaker._outcomes) == [True]
+
+
+@pytest.mark.parametrize("status", [400, 401, 413])
+def test_client_errors_do_not_trip_breaker(monkeypatch, breaker, status):
+    evaluation, _ = grade(monkeypatch, status)
+    assert evaluation["error"]
+    assert breaker.state == CLOSED
+    assert not breaker._outcomes
+
+
+def test_server_error_trips_breaker(monkeypatch, breaker):
+    grade(monkeypatch, 503)
+    assert breaker.state == OPEN
+
+
+def test_connection_error_trips_breaker(monkeypatch, breaker):
+    evaluation, _ = grade(monkeypatch, requests.exceptions.ConnectionError("down"))
+    assert evaluation["pending"]
+    assert breaker.state == OPEN
+
+
+def test_full_timeout_trips_breaker(monkeypatch, breaker):
+    grade(monkeypatch, requests.exceptions.ReadTimeout("slow"))
+    assert breaker.state == OPEN
+
+
+def test_deadline_truncated_timeout_does_not_trip_breaker(monkeypatch, breaker):
+    evaluation, fake = grade(
+        monkeypatch,
+        requests.exceptions.ReadTimeout("slow"),
+        deadline=time.monotonic() + 2,
+    )
+    assert evaluation["pending"]
+    assert fake.timeouts[0] <= 2
+    assert breaker.state == CLOSED
+    assert not breaker._outcomes
+
+
+def test_no_call_once_deadline_has_passed(monkeypatch, breaker):
+    evaluation, fake = grade(monkeypatch, 200, deadline=time.monotonic() - 1)
+    assert evaluation["pending"]
+    assert fake.timeouts == []
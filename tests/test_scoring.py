@@ -0,0 +1,82 @@
+import pytest
+
+from residentcase.scoring import (
+    coverage_matrix,
+    provisional_evaluation,
+    provisional_scores,
+    reference_points,
+    score_agreement,
+    tokenize,
+)
+
+MANAGEMENT = """
+**Management:**
+- Start **metformin** 500 mg daily \\[1\\]
+- Refer to **diabetes education** for lifestyle counselling
+- Check HbA1c in three months
+"""
+
+
+def test_tokenize_drops_stopwords_and_plurals():
+    assert tokenize("The patients should use Insulins and SGLT2-inhibitors") == [
+        "insulin",
+        "sglt2-inhibitor",
+    ]
+
+
+def test_reference_points_split_bullets_and_key_terms():
+    points = reference_points(MANAGEMENT)
+    texts = [text for text, _, _ in points]
+
+    assert "Start metformin 500 mg daily" in texts
+    metformin = points[texts.index("Start metformin 500 mg daily")]
+    assert metformin[1] == ("metformin",)
+    assert "metformin" not in metformin[2]
+
+
+def test_key_term_alone_is_a_hit():
+    coverage = coverage_matrix(MANAGEMENT, ["metformin"])
+    texts = [text for text, _, _ in reference_points(MANAGEMENT)]
+    assert coverage[0, texts.index("Start metformin 500 mg daily")] == 1.0
+
+
+def test_scores_rank_fuller_responses_higher():
+    scores = provisional_scores(
+        MANAGEMENT,
+        [
+            "Start metformin, refer to diabetes education, check HbA1c in three months",
+            "Start metformin",
+            "Reassure and discharge",
+        ],
+    )
+    assert scores[0] > scores[1] > scores[2]
+    assert scores[2] == 0
+    assert all(0 <= s <= 100 for s in scores)
+
+
+def test_no_reference_points_scores_zero():
+    assert list(provisional_scores("No bullets here", ["anything"])) == [0]
+
+
+def test_provisional_evaluation_matches_score():
+    response = "Start metformin"
+    evaluation = provisional_evaluation(MANAGEMENT, response)
+
+    assert evaluation["provisional"]
+    assert evaluation["score"] == provisional_scores(MANAGEMENT, [response])[0]
+    assert "metformin" in evaluation["checklist"]
+    assert evaluation["tally"].endswith(
+        f"out of {len(reference_points(MANAGEMENT))} points"
+    )
+
+
+def test_score_agreement():
+    agreement = score_agreement([10, 50, 90], [20, 60, 100])
+    assert agreement["n"] == 3
+    assert agreement["mae"] == 10.0
+    assert agreement["correlation"] == pytest.approx(1.0)
+
+
+def test_score_agreement_without_spread_has_no_correlation():
+    assert score_agreement([50, 50], [40, 60])["correlation"] is None
+    assert score_agreement([], []) == {"n": 0, "mae": None, "correlation": None}
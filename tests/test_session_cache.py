@@ -0,0 +1,67 @@
+from residentcase.session_cache import ByteBudgetCache, EvaluationCache, entry_size
+from residentcase.store import EvaluationStore
+
+
+def test_least_recently_used_entries_are_evicted():
+    cache = ByteBudgetCache(30)
+    cache.put("a", "x", size=10)
+    cache.put("b", "y", size=10)
+    cache.put("c", "z", size=10)
+    cache.get("a")
+    cache.put("d", "w", size=10)
+
+    assert "b" not in cache
+    assert all(key in cache for key in "acd")
+    assert cache.bytes == 30
+    assert cache.evictions == 1
+
+
+def test_size_is_taken_once_when_given():
+    cache = ByteBudgetCache(100)
+    value = {"score": 80, "full_evaluation": "x" * 500}
+    cache.put("a", value, size=40)
+    assert cache.bytes == 40
+    cache.put("b", {"score": 1})
+    assert cache.bytes == 40 + entry_size({"score": 1})
+
+
+def test_oversized_entry_is_not_kept():
+    cache = ByteBudgetCache(10)
+    cache.put("a", "x", size=5)
+    cache.put("b", "y", size=11)
+    assert "b" not in cache
+    assert cache.bytes == 5
+
+
+def test_session_cache_counts_hits_and_misses():
+    cache = EvaluationCache(1000)
+    cache.put("a", {"pending": True})
+    cache.get("a")
+    cache.get("b")
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 1, 1)
+
+
+def test_store_memory_is_bounded(tmp_path):
+    evaluation = {"score": 70, "full_evaluation": "x" * 100}
+    store = EvaluationStore(str(tmp_path / "e.sqlite3"), memory_bytes=500)
+    for case_number in range(1, 11):
+        store.put(case_number, "d", evaluation)
+
+    assert store._memory.bytes <= 500
+    assert len(store._memory) < 10
+    # Evicted rows are still served from SQLite
+    assert store.get(1, "d") == evaluation
+
+
+def test_preload_keeps_newest_that_fit(tmp_path):
+    path = str(tmp_path / "e.sqlite3")
+    writer = EvaluationStore(path, memory_bytes=0)
+    for case_number in range(1, 11):
+        writer.put(case_number, "d", {"case": case_number, "pad": "x" * 100})
+
+    store = EvaluationStore(path, memory_bytes=500)
+    loaded = store.preload()
+    assert 0 < loaded < 10
+    assert (10, "d") in store._memory
+    assert (1, "d") not in store._memory
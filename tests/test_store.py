@@ -0,0 +1,104 @@
+import os
+
+import pytest
+
+from residentcase import config, store
+from residentcase.store import EvaluationStore, SubmissionStore
+
+
+@pytest.fixture
+def store_dir(tmp_path, monkeypatch):
+    monkeypatch.setitem(
+        config._overrides, "EVAL_STORE_PATH", str(tmp_path / "evaluations.sqlite3")
+    )
+    monkeypatch.setitem(
+        config._overrides,
+        "SUBMISSION_STORE_PATH",
+        str(tmp_path / "submissions.sqlite3"),
+    )
+    monkeypatch.setitem(config._overrides, "TALLY_FORM_ID", "current")
+    store.migrate_legacy_stores.cache_clear()
+    yield tmp_path
+    store.migrate_legacy_stores.cache_clear()
+
+
+def legacy_stores(folder, form_id):
+    """Unsuffixed stores as a single-form deployment left them"""
+    submissions = SubmissionStore(str(folder / "submissions.sqlite3"))
+    submissions.upsert([{"id": "s1", "formId": form_id, "submittedAt": "2026"}])
+    evaluations = EvaluationStore(str(folder / "evaluations.sqlite3"))
+    evaluations.put(1, "abc", {"score": 80})
+    submissions._conn.close()
+    evaluations._conn.close()
+
+
+def test_every_form_is_suffixed(store_dir):
+    assert store.form_store_path("/x/evaluations.sqlite3", "f1") == (
+        "/x/evaluations-f1.sqlite3"
+    )
+    # The current default form is namespaced too
+    assert store.form_store_path("/x/evaluations.sqlite3", None) == (
+        "/x/evaluations-current.sqlite3"
+    )
+
+
+def test_legacy_stores_move_to_their_recorded_form(store_dir):
+    # TALLY_FORM_ID changed since the legacy stores were written
+    legacy_stores(store_dir, "previous")
+
+    assert SubmissionStore(form_id="current").count() == 0
+    assert EvaluationStore(form_id="current").get(1, "abc") is None
+    assert SubmissionStore(form_id="previous").count() == 1
+    assert EvaluationStore(form_id="previous").get(1, "abc") == {"score": 80}
+    assert not os.path.exists(store_dir / "submissions.sqlite3")
+    assert not os.path.exists(store_dir / "evaluations.sqlite3")
+
+
+def test_legacy_stores_without_submissions_go_to_default_form(store_dir):
+    EvaluationStore(str(store_dir / "evaluations.sqlite3")).put(2, "d", {"score": 5})
+
+    assert EvaluationStore(form_id="current").get(2, "d") == {"score": 5}
+
+
+def test_existing_form_store_is_not_overwritten(store_dir):
+    existing = EvaluationStore(str(store_dir / "evaluations-previous.sqlite3"))
+    existing.put(1, "abc", {"score": 10})
+    legacy_stores(store_dir, "previous")
+
+    assert EvaluationStore(form_id="previous").get(1, "abc") == {"score": 10}
+    assert os.path.exists(store_dir / "evaluations.sqlite3")
+
+
+def test_response_hash_ignores_whitespace_and_unicode_form():
+    text = "**Management:**\nStart metformin"
+    assert store.normalize_response(" **Management:**\n\n Start\tmetformin \n") == (
+        "**Management:** Start metformin"
+    )
+    assert store.response_hash(text + "  \n") == store.response_hash(text)
+    # NFC and NFD spellings of the same accented text hash alike
+    assert store.response_hash("cafe\u0301") == store.response_hash("caf\u00e9")
+    assert store.response_hash("metformin") != store.response_hash("insulin")
+
+
+def test_whitespace_only_resubmission_reuses_stored_evaluation(tmp_path, monkeypatch):
+    from residentcase import grading
+
+    evaluations = EvaluationStore(str(tmp_path / "evaluations.sqlite3"))
+    monkeypatch.setattr(
+        grading, "get_evaluation_store", lambda form_id=None: evaluations
+    )
+    calls = []
+
+    def fake_grader(case_description, management, response, deadline=None):
+        calls.append(response)
+        return {"score": 70, "full_evaluation": "SCORE: 70"}
+
+    monkeypatch.setattr(grading, "rate_response_with_gemini", fake_grader)
+    case = {"description": "55M with new diabetes", "management": "- Metformin"}
+
+    first = grading.evaluate_response(1, case, "Start metformin\n")
+    again = grading.evaluate_response(1, case, "  Start   metformin\n\n")
+
+    assert len(calls) == 1
+    assert again["score"] == first["score"] == 70
+    assert again["response_hash"] == first["response_hash"]
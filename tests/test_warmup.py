@@ -0,0 +1,38 @@
+import threading
+
+from residentcase import ingest
+from residentcase.ingest import SubmissionSync
+from residentcase.store import SubmissionStore
+from residentcase.warmup import READY, Warmup, warmup_steps
+
+
+class SlowFetch:
+    """Tally stand-in that blocks until released, counting fetches"""
+
+    def __init__(self):
+        self.calls = 0
+        self.release = threading.Event()
+
+    def __call__(self):
+        self.calls += 1
+        self.release.wait(5)
+        return [{"id": "s1", "submittedAt": "2026"}]
+
+
+def test_warmup_and_page_view_share_one_fetch(monkeypatch):
+    fetch = SlowFetch()
+    sync = SubmissionSync(SubmissionStore(":memory:"), fetch=fetch)
+    monkeypatch.setattr(ingest, "get_submission_sync", lambda form_id=None: sync)
+    monkeypatch.setattr(ingest, "get_cohorts", lambda: {"f": "f"})
+
+    steps = dict(warmup_steps())
+    warmup = Warmup([("Tally submissions", steps["Tally submissions"])]).start()
+    page_view = threading.Thread(target=sync.get)
+    page_view.start()
+    fetch.release.set()
+    page_view.join(5)
+    warmup.wait(5)
+
+    assert warmup.status["Tally submissions"] == READY
+    assert warmup.details["Tally submissions"] == "1 submissions"
+    assert fetch.calls == 1